@@ -0,0 +1,200 @@
+"""批量模式入口：不走 input()，把一个目录（或通配符）下的接龙导出文本一次性生成假单
+
+用法示例：
+    python batch_main.py 接龙导出/ --date "week+1 1"
+    python batch_main.py "接龙导出/*.txt" --date td+1 -j 4 --output-dir 输出
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Optional
+
+from config_reader import ConfigReader
+from docx_generator import DocumentGenerator
+from input_handler import 分组多输出输入器, print_red, print_warning
+from output_sinks import resolve_save_path
+
+
+# 每个工作进程各自持有一个 DocumentGenerator，避免每个任务都重新读配置
+_worker_docx_generator: Optional[DocumentGenerator] = None
+
+
+def _init_worker(config_file_path: str, save_path: Optional[str]) -> None:
+    global _worker_docx_generator
+    config_reader = ConfigReader(config_file_path)
+    if save_path is not None:
+        config_reader.override({"output_settings": {"save_path": save_path}})
+    _worker_docx_generator = DocumentGenerator(config_reader)
+
+
+def _create_leave_form_in_worker(task: dict[str, Any]) -> str:
+    """在工作进程中生成一份假单，返回输出路径"""
+    return _worker_docx_generator.create_leave_form(
+        task["students"], task["year"], task["month"], task["day"],
+        cause=task["cause"], leave_type=task["leave_type"])
+
+
+def collect_input_files(sources: list[str]) -> list[Path]:
+    """把目录 / 通配符 / 文件路径展开成接龙文本文件列表（去重并保持顺序）"""
+    files: dict[Path, None] = {}
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matched = sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() == ".txt")
+        elif path.is_file():
+            matched = [path]
+        else:
+            matched = sorted(Path(p) for p in glob.glob(source, recursive=True) if Path(p).is_file())
+        if not matched:
+            print_warning(f"没有找到接龙文件: {source}")
+        for p in matched:
+            files[p] = None
+    return list(files)
+
+
+def _unique_cause(cause: str, 子分组: str, file_path: Path, used_causes: set[str]) -> str:
+    """不同文件里出现同名子分组时，依次用文件名、上级目录名、序号区分，避免输出文件互相覆盖"""
+    new_cause = f"{cause}{子分组}"
+    if new_cause not in used_causes:
+        return new_cause
+    new_cause = f"{cause}{file_path.stem}{子分组}"
+    if new_cause not in used_causes:
+        return new_cause
+    new_cause = f"{cause}{file_path.parent.name}{file_path.stem}{子分组}"
+    number = 2
+    base_cause = new_cause
+    while new_cause in used_causes:
+        new_cause = f"{base_cause}{number}"
+        number += 1
+    return new_cause
+
+
+def build_tasks(handler: 分组多输出输入器, files: list[Path], year: int, month: int, day: int,
+                cause: str, leave_type: str) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """解析并分组每个文件，返回 (生成任务列表, 每个文件的报告条目)"""
+    tasks: list[dict[str, Any]] = []
+    file_reports: list[dict[str, Any]] = []
+    used_causes: set[str] = set()
+    for file_path in files:
+        file_report: dict[str, Any] = {"file": str(file_path), "groups": [], "error": None}
+        file_reports.append(file_report)
+        try:
+            grouped = handler._group_stu_data_by_子分组(
+                handler._iter_stu_data_match_result_from_source(file_path))
+        except Exception as e:
+            print_red(f"解析 {file_path} 失败: {e}")
+            file_report["error"] = str(e)
+            continue
+        if not grouped:
+            print_warning(f"{file_path} 中没有解析到学生数据")
+
+        for 子分组, stu_data in grouped.items():
+            new_cause = _unique_cause(cause, 子分组, file_path, used_causes)
+            used_causes.add(new_cause)
+            group_report: dict[str, Any] = {"子分组": 子分组, "人数": len(stu_data),
+                                            "cause": new_cause, "output": None, "error": None}
+            file_report["groups"].append(group_report)
+            tasks.append({"students": stu_data, "year": year, "month": month, "day": day,
+                          "cause": new_cause, "leave_type": leave_type, "report": group_report})
+    return tasks, file_reports
+
+
+def run_tasks(tasks: list[dict[str, Any]], workers: int, config_file_path: str,
+              save_path: Optional[str]) -> None:
+    """把 create_leave_form 分摊到多个进程中执行，结果写回各任务的报告条目"""
+    total = len(tasks)
+    if workers <= 1:
+        _init_worker(config_file_path, save_path)
+        for done, task in enumerate(tasks, start=1):
+            _record_result(task, done, total, lambda: _create_leave_form_in_worker(_task_payload(task)))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(config_file_path, save_path)) as executor:
+        futures = {executor.submit(_create_leave_form_in_worker, _task_payload(task)): task for task in tasks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            _record_result(futures[future], done, total, future.result)
+
+
+def _task_payload(task: dict[str, Any]) -> dict[str, Any]:
+    """去掉报告条目，只把生成需要的数据发给工作进程"""
+    return {key: value for key, value in task.items() if key != "report"}
+
+
+def _record_result(task: dict[str, Any], done: int, total: int, get_result) -> None:
+    report = task["report"]
+    try:
+        report["output"] = get_result()
+    except Exception as e:
+        report["error"] = str(e)
+        print_red(f"[{done}/{total}] {report['cause']} 生成失败: {e}")
+    else:
+        print(f"[{done}/{total}] {report['cause']}（{report['人数']}人） -> {report['output']}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="批量把接龙导出文本生成假单")
+    parser.add_argument("sources", nargs="+", help="接龙文本所在目录、通配符或文件路径")
+    parser.add_argument("-d", "--date", required=True, help='日期表达式，如 "2025-4-27"、"td+1"、"week+1 0"')
+    parser.add_argument("-c", "--config", default="config.json", help="配置文件路径")
+    parser.add_argument("--cause", default=None, help="请假原因前缀，默认取配置里的 cause")
+    parser.add_argument("--leave-type", default="evening", choices=["morning", "evening"])
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="工作进程数")
+    parser.add_argument("-o", "--output-dir", default=None, help="输出目录，默认取配置里的 save_path")
+    parser.add_argument("--report", default=None, help="汇总报告（JSON）输出路径，默认写到输出目录")
+    args = parser.parse_args(argv)
+
+    config_reader = ConfigReader(args.config)
+    handler = 分组多输出输入器(config_reader=config_reader)
+    try:
+        year, month, day = handler._get_ymd_time_by_str_save(args.date)
+    except ValueError as e:
+        print_red(f"日期解析错误: {e}")
+        return 1
+    cause: str = args.cause if args.cause is not None else config_reader.get("cause", "？？部")
+
+    files = collect_input_files(args.sources)
+    if not files:
+        print_red("没有可处理的接龙文件")
+        return 1
+
+    started = time.perf_counter()
+    tasks, file_reports = build_tasks(handler, files, year, month, day, cause, args.leave_type)
+    print(f"共 {len(files)} 个文件，{len(tasks)} 份假单，{args.workers} 个进程")
+    run_tasks(tasks, args.workers, args.config, args.output_dir)
+    elapsed = time.perf_counter() - started
+
+    failed = sum(1 for task in tasks if task["report"]["error"])
+    failed_files = sum(1 for file_report in file_reports if file_report["error"])
+    report = {
+        "date": f"{year}-{month}-{day}",
+        "leave_type": args.leave_type,
+        "workers": args.workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "forms": len(tasks),
+        "failed": failed,
+        "failed_files": failed_files,
+        "files": file_reports,
+    }
+    report_path = args.report
+    if report_path is None:
+        save_path = resolve_save_path(args.output_dir or config_reader.get("output_settings.save_path", "desktop"))
+        report_path = os.path.join(save_path, "批量生成报告.json")
+    try:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print_red(f"写入汇总报告失败: {e}")
+    else:
+        print(f"汇总报告: {report_path}")
+    print(f"完成：{len(tasks) - failed} 成功，{failed} 失败，{failed_files} 个文件解析失败，用时 {elapsed:.2f}s")
+    return 1 if failed or failed_files else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
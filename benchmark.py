@@ -0,0 +1,254 @@
+"""接龙解析与假单生成的基准测试
+
+按 _get_接龙输入 里的样例合成不同规模的接龙文本（子分组、中文/阿拉伯数字、各种分隔符、
+行尾手机号、表情和混进来的闲聊行），分别计时各输入器的解析、分组、文档构建和序列化，
+另外在新进程中计时启动（出现交互提示、加载 python-docx）。
+结果（每秒处理行数、启动耗时）与基线文件对比，退化超过容差时以非零状态退出。
+
+用法示例：
+    python benchmark.py                          # 100 / 1k / 10k / 100k 行，与基线对比
+    python benchmark.py --sizes 100 1000 -r 5
+    python benchmark.py --update-baseline        # 把本次结果记为新的基线
+基线与机器相关，第一次运行（或基线文件不存在）时会直接写入。
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Optional, TypeVar
+
+from config_reader import ConfigReader
+from input_handler import ABC_输入器, 分组多输出输入器, 我的输入器, 经典输入, print_red, print_warning
+from output_sinks import BytesIOSink
+
+T = TypeVar("T")
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+
+子分组_choices = ("视频组", "软件组", "宣传组", "")
+学年_choices = ("23", "24", "25", "二四", "二五")
+班级号_choices = ("", "", "2", "二", "1班", "二班")
+分隔符_choices = (" ", "  ", "-", ",", ";", "，", "；")
+行尾_choices = ("", "", "", "🪳", "👌")
+闲聊行_choices = ("收到", "好的👌", "@所有人 记得接龙", "（补）", "请假的同学写上班级", "不是，这个要写学号吗")
+姓氏 = "王李张刘陈杨黄赵周吴徐孙马朱胡郭何林高罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘蒋蔡余杜叶程苏魏吕丁沈姚卢姜崔钟谭汪范金石廖贾夏韦方白邹孟熊秦邱江尹薛段雷侯龙史黎贺顾毛郝龚邵钱严武戴莫孔汤"
+名字 = "子涵浩宇欣怡梓轩思雨佳琪俊杰若曦晨阳嘉铭心玥婕智睿剑书玮则伽昊籼增弋松楚鑫正铁涵婷雪峰文博"
+
+
+def generate_接龙(line_count: int, class_mappings: dict[str, str], seed: int = 0,
+                  junk_ratio: float = 0.05) -> tuple[str, int]:
+    """合成 line_count 行（不含表头）的接龙文本，返回 (文本, 其中学生行的数量)
+
+    同一个 seed 总是得到同样的文本，不同版本之间的结果才能比较。
+    """
+    rng = random.Random(seed)
+    choice = rng.choice
+    random_ = rng.random
+    # 带 "班" 字的写法（如 "数字媒体技术班"）和后面的班级号连在一起时本来就解析不了，不参与合成
+    专业名_choices = tuple(sorted(name for name in {*class_mappings, *class_mappings.values()} if "班" not in name))
+
+    lines = ["#接龙", "请假接龙，格式：组别+年级+专业+班级 姓名", "", "空行之前的都是表头", ""]
+    student_count = 0
+    for i in range(1, line_count + 1):
+        编号 = f"{i}. " if random_() < 0.9 else f"{i}."
+        if random_() < junk_ratio:
+            lines.append(f"{编号}{choice(闲聊行_choices)}")
+            continue
+        年制 = "五年制" if random_() < 0.05 else ""
+        单 = "单" if random_() < 0.3 else ""
+        姓名 = choice(姓氏) + "".join(choice(名字) for _ in range(rng.randint(1, 2)))
+        手机号 = f"{choice(('', ' ', '   '))}1{rng.randint(3000000000, 9999999999)}" if random_() < 0.2 else ""
+        lines.append(f"{编号}{choice(子分组_choices)}{choice(学年_choices)}{年制}{choice(专业名_choices)}{单}"
+                     f"{choice(班级号_choices)}{choice(分隔符_choices)}{姓名}{手机号}{choice(行尾_choices)}")
+        student_count += 1
+    lines.append("")
+    return "\n".join(lines) + "\n", student_count
+
+
+def _best_of(repeat: int, func: Callable[[], T]) -> tuple[float, T]:
+    """执行 repeat 次，返回 (最短耗时, 最后一次的结果)"""
+    best = float("inf")
+    result: Any = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        if elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def _save_to_memory(docs: list) -> int:
+    sink = BytesIOSink()
+    return sum(len(sink.write(doc, "")) for doc in docs)
+
+
+def bench_handler(handler: ABC_输入器, text: str, line_count: int, repeat: int,
+                  date: tuple[int, int, int] = (2025, 4, 27), cause: str = "基准测试"
+                  ) -> dict[str, dict[str, float]]:
+    """计时一个输入器处理一份接龙文本的各阶段，返回 {阶段: {seconds, lines_per_second}}"""
+    year, month, day = date
+    docx_generator = handler.docx_generator
+    timings: dict[str, float] = {}
+
+    # 解析时的警告、经典输入的逐行回显都不计入终端输出
+    with redirect_stdout(io.StringIO()):
+        if isinstance(handler, 我的输入器):
+            lines = text.splitlines()
+            timings["parse"], students = _best_of(
+                repeat, lambda: list(handler._iter_stu_data_match_result_from_lines(lines)))
+        else:
+            timings["parse"], students = _best_of(repeat, lambda: handler.parse_student_data(text))
+
+        if isinstance(handler, 分组多输出输入器):
+            timings["group"], grouped = _best_of(repeat, lambda: handler._group_stu_data_by_子分组(students))
+            groups = [(f"{cause}{子分组}", stu_data) for 子分组, stu_data in grouped.items()]
+        else:
+            groups = [(cause, students)]
+
+        timings["build"], docs = _best_of(repeat, lambda: [
+            docx_generator.build_leave_form(stu_data, year, month, day, group_cause)
+            for group_cause, stu_data in groups])
+        timings["save"], _ = _best_of(repeat, lambda: _save_to_memory(docs))
+
+    return {stage: {"seconds": round(seconds, 6),
+                    "lines_per_second": round(line_count / seconds, 1) if seconds > 0 else 0.0}
+            for stage, seconds in timings.items()}
+
+
+def run_benchmarks(config_reader: ConfigReader, sizes: list[int], handler_names: list[str],
+                   repeat: int, seed: int) -> dict[str, dict[str, dict[str, dict[str, float]]]]:
+    """返回 {输入器名: {行数: {阶段: 结果}}}"""
+    handler_makers: dict[str, type[ABC_输入器]] = {
+        "经典输入": 经典输入, "我的输入器": 我的输入器, "分组多输出输入器": 分组多输出输入器}
+    class_mappings = config_reader.get("class_mappings", {})
+    corpora = {size: generate_接龙(size, class_mappings, seed=seed) for size in sizes}
+    warm_up_text, _ = generate_接龙(50, class_mappings, seed=seed)
+
+    results: dict[str, dict[str, dict[str, dict[str, float]]]] = {}
+    for handler_name in handler_names:
+        handler = handler_makers[handler_name](config_reader=config_reader)
+        # 预热：编译正则、构建专业名自动机和文档骨架
+        bench_handler(handler, warm_up_text, 50, 1)
+        for size in sizes:
+            text, student_count = corpora[size]
+            # 十万行级别的构建要几秒，只跑一次
+            stages = bench_handler(handler, text, size, 1 if size >= 100_000 else repeat)
+            results.setdefault(handler_name, {})[str(size)] = stages
+            print(f"{handler_name:<10} {size:>7} 行（{student_count} 名学生） " + "  ".join(
+                f"{stage} {result['seconds'] * 1000:.1f}ms" for stage, result in stages.items()))
+    return results
+
+
+# 启动耗时：解释器本身、出现交互提示（导入 main）、再加载 python-docx
+STARTUP_SNIPPETS = {
+    "interpreter": "pass",
+    "prompt_ready": "import main",
+    "docx_loaded": "import main, docx",
+}
+
+
+def bench_startup(repeat: int) -> dict[str, dict[str, float]]:
+    """在新进程中计时各启动阶段，取最快一次"""
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    results: dict[str, dict[str, float]] = {}
+    for name, snippet in STARTUP_SNIPPETS.items():
+        seconds, _ = _best_of(repeat, lambda: subprocess.run([sys.executable, "-c", snippet], cwd=repo_dir,
+                                                             check=True, stdout=subprocess.DEVNULL))
+        results[name] = {"seconds": round(seconds, 6)}
+        print(f"启动 {name:<13} {seconds * 1000:.1f}ms")
+    return results
+
+
+def compare_startup_with_baseline(startup: dict, baseline: dict, tolerance: float) -> list[str]:
+    """启动耗时比基线多出 tolerance 以上（且超过 10ms，避免噪声）的项"""
+    regressions = []
+    for name, result in startup.items():
+        base = baseline.get(name)
+        if not base or not base.get("seconds"):
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        if ratio > 1 + tolerance and result["seconds"] - base["seconds"] > 0.01:
+            regressions.append(f"启动 {name}: {result['seconds'] * 1000:.1f}ms，基线 "
+                               f"{base['seconds'] * 1000:.1f}ms（{ratio:.0%}）")
+    return regressions
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """逐项对比每秒处理行数，返回低于基线 (1 - tolerance) 倍的项"""
+    regressions = []
+    for handler_name, by_size in results.items():
+        for size, stages in by_size.items():
+            for stage, result in stages.items():
+                base = baseline.get(handler_name, {}).get(size, {}).get(stage)
+                if not base or not base.get("lines_per_second"):
+                    continue
+                ratio = result["lines_per_second"] / base["lines_per_second"]
+                if ratio < 1 - tolerance:
+                    regressions.append(f"{handler_name} {size} 行 {stage}: "
+                                       f"{result['lines_per_second']:.0f} 行/秒，基线 "
+                                       f"{base['lines_per_second']:.0f} 行/秒（{ratio:.0%}）")
+    return regressions
+
+
+def write_baseline(path: str, results: dict, seed: int, startup: Optional[dict] = None) -> None:
+    baseline = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": results,
+        "startup": startup or {},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+    print(f"基线已写入: {path}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="接龙解析与假单生成的基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="接龙行数")
+    parser.add_argument("--handlers", nargs="+", default=["经典输入", "我的输入器", "分组多输出输入器"],
+                        choices=["经典输入", "我的输入器", "分组多输出输入器"])
+    parser.add_argument("-c", "--config", default="config.json", help="配置文件路径")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    parser.add_argument("--seed", type=int, default=0, help="合成接龙的随机种子")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果写为基线")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="允许的吞吐量下降比例")
+    parser.add_argument("--skip-startup", action="store_true", help="不测启动耗时")
+    args = parser.parse_args(argv)
+
+    startup = {} if args.skip_startup else bench_startup(max(5, args.repeat))
+    results = run_benchmarks(ConfigReader(args.config), args.sizes, args.handlers,
+                             max(1, args.repeat), args.seed)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        write_baseline(args.baseline, results, args.seed, startup)
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("seed") != args.seed:
+        print_warning(f"基线的随机种子为 {baseline.get('seed')}，与本次 {args.seed} 不同，结果不可比")
+    regressions = compare_with_baseline(results, baseline.get("results", {}), args.tolerance)
+    regressions += compare_startup_with_baseline(startup, baseline.get("startup", {}), args.tolerance)
+    if regressions:
+        print_red(f"性能比基线差 {args.tolerance:.0%} 以上：")
+        for line in regressions:
+            print_red(f"  {line}")
+        return 1
+    print(f"与基线 {args.baseline} 相比没有退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
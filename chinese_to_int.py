@@ -17,39 +17,124 @@ num_to_chinese_arr = ['零', '一', '二', '三', '四', '五', '六', '七', '
 
 all_chinese_num = ''.join(chinese_dict.keys())
 
+# 位值单位，"十二"、"二十五"、"一百零五" 这类写法
+unit_dict = {'十': 10, '拾': 10, '百': 100, '佰': 100}
+# 接龙里的学年、班级号不会过百，解析正则只放进十位单位
+ten_chars = '十拾'
 
-def chinese_to_int(chinese_num) -> int:
-    # 定义中文数字映射（包含大小写和全角半角）
+# 各种写法的单个数字（小写、大写、全角、半角）-> 半角数字，一次 translate 完成
+_to_ascii_digit_table = str.maketrans({char: str(value) for char, value in chinese_dict.items()})
+# 半角数字 -> 小写中文数字，逐位
+_to_chinese_digit_table = str.maketrans({str(value): char for value, char in enumerate(num_to_chinese_arr)})
+# 批量规整接龙时只换全角数字：它们在解析正则里与半角数字同属一类，换掉后匹配结果不变；
+# 大写数字、"两" 等也是汉字，可能出现在姓名或专业名里，不能动
+_fullwidth_digit_table = str.maketrans("０１２３４５６７８９", "0123456789")
 
-    result = 0
-    for char in chinese_num:
-        if char in chinese_dict:
-            result = result * 10 + chinese_dict[char]
-        else:
-            raise ValueError(f"无效的中文数字字符: {char}")
+LOOKUP_MAX = 999
 
-    return result
 
-def chinese_to_int_op(chinese_num) -> Optional[int]:
-    # 定义中文数字映射（包含大小写和全角半角）
+def _to_positional(num: int) -> str:
+    """0–999 的位值写法：10 -> 十，25 -> 二十五，105 -> 一百零五，110 -> 一百一十"""
+    if num == 0:
+        return num_to_chinese_arr[0]
+    hundreds, tens, ones = num // 100, num // 10 % 10, num % 10
+    parts = []
+    if hundreds:
+        parts.append(num_to_chinese_arr[hundreds] + "百")
+    if tens:
+        parts.append(("" if tens == 1 and not hundreds else num_to_chinese_arr[tens]) + "十")
+    elif hundreds and ones:
+        parts.append(num_to_chinese_arr[0])
+    if ones:
+        parts.append(num_to_chinese_arr[ones])
+    return "".join(parts)
 
-    result = 0
+
+# 0–999 预先算好两个方向的结果；中文 -> 整数同时收录逐位写法（二五）和位值写法（二十五）
+_int_to_digitwise = [str(num).translate(_to_chinese_digit_table) for num in range(LOOKUP_MAX + 1)]
+_int_to_positional = [_to_positional(num) for num in range(LOOKUP_MAX + 1)]
+_chinese_to_int_table = {text: num for num in range(LOOKUP_MAX, -1, -1)
+                         for text in (_int_to_digitwise[num], _int_to_positional[num])}
+
+
+def _parse_positional(chinese_num: str) -> Optional[int]:
+    """按位值解析含 十/百 的写法，不合法时返回 None
+
+    十前面的一可以省略（十二）；单位后直接跟的数字按下一位算（一百五 = 150），隔了零则是个位（一百零五）。
+    """
+    total = 0
+    digit: Optional[int] = None
+    last_unit = LOOKUP_MAX + 1
+    zero_gap = False  # 上一个单位之后出现过零
     for char in chinese_num:
-        if char in chinese_dict:
-            result = result * 10 + chinese_dict[char]
+        value = chinese_dict.get(char)
+        if value == 0:
+            if digit is not None or zero_gap or last_unit > LOOKUP_MAX:
+                return None
+            zero_gap = True
+        elif value is not None:
+            if digit is not None:
+                return None  # 两个数字连在一起
+            digit = value
         else:
-            return None
+            unit = unit_dict.get(char)
+            if unit is None or unit >= last_unit or zero_gap:
+                return None
+            total += (1 if digit is None else digit) * unit
+            digit, last_unit = None, unit
+    if digit is None:
+        return None if zero_gap else total
+    return total + (digit if zero_gap else digit * last_unit // 10)
+
+
+def chinese_to_int(chinese_num) -> int:
+    """中文数字转整数：逐位写法（二五 -> 25，全角、大写、半角可混写）或位值写法（二十五 -> 25）"""
+    value = _chinese_to_int_table.get(chinese_num)
+    if value is not None:
+        return value
+
+    if any(char in unit_dict for char in chinese_num):
+        value = _parse_positional(chinese_num)
+        if value is None:
+            raise ValueError(f"无效的中文数字: {chinese_num}")
+        return value
+
+    digits = chinese_num.translate(_to_ascii_digit_table)
+    if not (digits.isascii() and digits.isdigit()):
+        for char in digits:
+            if not ("0" <= char <= "9"):
+                raise ValueError(f"无效的中文数字字符: {char}")
+        return 0  # 空串
+    return int(digits)
+
+
+def chinese_to_int_op(chinese_num) -> Optional[int]:
+    """同 chinese_to_int，无法解析时返回 None"""
+    value = _chinese_to_int_table.get(chinese_num)
+    if value is not None:
+        return value
+    try:
+        return chinese_to_int(chinese_num)
+    except ValueError:
+        return None
 
-    return result
 
 def int_to_chinese_op(num: int) -> Optional[str]:
+    """逐位写成中文数字：25 -> 二五（班级名沿用这种写法）"""
     if num < 0:
         raise ValueError("只能转换非负整数")
-    if num == 0:
-        return num_to_chinese_arr[0]
-    chinese_num = ""
-    while num > 0:
-        digit = num % 10
-        chinese_num = num_to_chinese_arr[digit] + chinese_num
-        num //= 10
-    return chinese_num
\ No newline at end of file
+    if num <= LOOKUP_MAX:
+        return _int_to_digitwise[num]
+    return str(num).translate(_to_chinese_digit_table)
+
+
+def int_to_chinese_positional(num: int) -> str:
+    """按位值写成中文数字：25 -> 二十五，只支持 0–999"""
+    if not 0 <= num <= LOOKUP_MAX:
+        raise ValueError(f"只支持 0–{LOOKUP_MAX}: {num}")
+    return _int_to_positional[num]
+
+
+def normalize_digits(text: str) -> str:
+    """把一整段接龙（或一行）里的全角数字换成半角，一次 translate 完成，在正则匹配之前调用"""
+    return text.translate(_fullwidth_digit_table)
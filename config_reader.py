@@ -1,12 +1,57 @@
 import json
+import os
+import threading
+import time
 from pathlib import Path
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
+class FrozenDict(dict):
+    """只读的 dict：配置快照在多个线程间共享，不允许原地修改（仍可 json.dumps、.copy() 得到普通 dict）"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("配置快照是只读的，请使用 ConfigReader.override 或 update_config")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __deepcopy__(self, memo) -> Dict[str, Any]:
+        return json.loads(json.dumps(self, ensure_ascii=False))
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class ConfigSnapshot:
+    """某一时刻的完整配置：嵌套的只读字典，加上预先展开好的 "a.b.c" -> 值 的扁平表"""
+    __slots__ = ("config", "flat", "file_stat")
+
+    def __init__(self, config: Dict[str, Any], file_stat: Optional[tuple[int, int]] = None):
+        self.config: FrozenDict = _freeze(config)
+        self.flat: Dict[str, Any] = {}
+        self._flatten(self.config, "")
+        self.file_stat = file_stat  # (mtime_ns, size)，用于判断文件是否变化
+
+    def _flatten(self, config: Dict[str, Any], prefix: str) -> None:
+        for key, value in config.items():
+            dotted_key = f"{prefix}{key}"
+            self.flat[dotted_key] = value
+            if isinstance(value, dict):
+                self._flatten(value, f"{dotted_key}.")
+
 
 class ConfigReader:
-    """读取和管理配置文件的类"""
+    """读取和管理配置文件的类
+
+    加载后的配置是不可变快照，get 只查一次扁平表，不加锁。每隔 reload_interval 秒检查一次
+    配置文件的修改时间，变化了就整体换成新快照；读者拿到的永远是某一个完整的快照。
+    """
     config_file_path: Path
 
     @classmethod
@@ -33,7 +78,10 @@ class ConfigReader:
             },
             "output_settings": {
                 "save_path": "desktop",
-                "file_name_format": "{year}年{month}月{day}日_{cause}假单.docx"
+                "file_name_format": "{year}年{month}月{day}日_{cause}假单.docx",
+                "skip_unchanged": True,
+                "combine_groups": False,
+                "cover_summary": True
             },
             "class_mappings": {
                 "网络技术": "网络",
@@ -52,14 +100,83 @@ class ConfigReader:
             "leave_types": {
                 "morning": "早自习",
                 "evening": "晚自习"
+            },
+            "fuzzy_major_settings": {
+                "max_distance": 1,
+                "auto_apply": False
+            },
+            "history_settings": {
+                "enabled": True,
+                "path": ""
+            },
+            "watch_settings": {
+                "inbox": "接龙收件箱",
+                "date": "td",
+                "leave_type": "evening",
+                "debounce_seconds": 0.5,
+                "poll_interval": 1.0
+            },
+            "session_settings": {
+                "path": "接龙会话.json"
+            },
+            "profile_settings": {
+                "enabled": False,
+                "summary_path": "profile_{timestamp}.json",
+                "cprofile_path": ""
             }
         }
         return default_config
 
-    def __init__(self, config_file_path: str = "config.json"):
+    def __init__(self, config_file_path: str = "config.json", reload_interval: Optional[float] = 1.0):
         self.config_file_path = Path(config_file_path)
         self.default_config = self.get_default_config_view()
-        self.config = self.load_config()
+        self.reload_interval = reload_interval
+        self._overrides: Dict[str, Any] = {}
+        self._reload_lock = threading.Lock()
+        self._next_check = float("inf") if reload_interval is None else time.monotonic() + reload_interval
+        file_stat = self._file_stat()
+        self._snapshot = ConfigSnapshot(self.load_config(), file_stat)
+
+    @property
+    def config(self) -> FrozenDict:
+        """当前快照的嵌套配置（只读）"""
+        return self._snapshot.config
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """当前快照；一次生成过程中需要多项配置保持一致时，先取快照再读"""
+        self._maybe_reload()
+        return self._snapshot
+
+    def _file_stat(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(self.config_file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() < self._next_check:
+            return
+        # 只有一个线程去检查文件，其他线程继续读旧快照，不等待
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.reload_interval
+            file_stat = self._file_stat()
+            if file_stat is None or file_stat == self._snapshot.file_stat:
+                return
+            try:
+                with self.config_file_path.open('r', encoding='utf-8') as f:
+                    user_config = json.load(f)
+            except Exception as e:
+                # 可能正写到一半，保留旧配置，下次再试
+                print(f"重新读取配置文件失败，继续使用原配置: {e}")
+                return
+            config = self._deep_merge(self._deep_merge(self.default_config, user_config), self._overrides)
+            self._snapshot = ConfigSnapshot(config, file_stat)
+        finally:
+            self._reload_lock.release()
 
     def load_config(self) -> Dict[str, Any]:
         """加载配置文件，如果不存在则创建默认配置"""
@@ -98,21 +215,25 @@ class ConfigReader:
         return result
 
     def get(self, key: str, default=None):
-        """获取配置值"""
-        keys = key.split('.')
-        value = self.config
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        return value
+        """获取配置值，key 可以是 "output_settings.save_path" 这样的点分路径"""
+        if time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._snapshot.flat.get(key, default)
+
+    def override(self, new_config: Dict[str, Any]):
+        """只在内存中覆盖部分配置（不写文件），配置文件热重载后依然生效"""
+        with self._reload_lock:
+            self._overrides = self._deep_merge(self._overrides, new_config)
+            self._snapshot = ConfigSnapshot(self._deep_merge(self._snapshot.config, new_config),
+                                            self._snapshot.file_stat)
 
     def update_config(self, new_config: Dict[str, Any]):
         """更新配置"""
-        self.config = self._deep_merge(self.config, new_config)
-        try:
-            with self.config_file_path.open('w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"更新配置文件失败: {e}")
\ No newline at end of file
+        with self._reload_lock:
+            config = self._deep_merge(self._snapshot.config, new_config)
+            try:
+                with self.config_file_path.open('w', encoding='utf-8') as f:
+                    json.dump(config, f, ensure_ascii=False, indent=2)
+            except Exception as e:
+                print(f"更新配置文件失败: {e}")
+            self._snapshot = ConfigSnapshot(config, self._file_stat())
@@ -1,41 +1,238 @@
-import os
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from typing import List, Tuple, Any, LiteralString
+# python-docx 和 lxml 加载要几十毫秒，只在第一次真正构建文档时才导入（各方法内局部导入），
+# 只做日期解析、或者用户还在输入时不必等它；交互模式下会在后台线程里提前预热
+from __future__ import annotations
+
+import copy
+import json
+import threading
+from collections import Counter
+from operator import attrgetter
+from typing import TYPE_CHECKING, List, Any, Mapping, Optional
+
+from docx_table_builder import FastTableBuilder
+from output_sinks import FileSystemSink, OutputSink
+from profiling import profiler
+from student_record import StudentRecord
+
+if TYPE_CHECKING:
+    from docx.document import Document
 
 
 class DocumentGenerator:
     """生成请假单文档的类"""
     config: Any
+    # 假单用到的段落样式：样式ID -> (样式名, font_settings 中的字体类型, 是否加粗, WD_ALIGN_PARAGRAPH 对齐方式名)
+    leave_form_styles: dict[str, tuple[str, str, bool, Optional[str]]] = {
+        "LeaveTitle": ("假单标题", "title", True, "CENTER"),
+        "LeaveSmall": ("假单小字", "small", False, "RIGHT"),
+        "LeaveContent": ("假单正文", "content", False, None),
+        "LeaveTableBody": ("假单表格", "normal", False, "CENTER"),
+        "LeaveTableHeader": ("假单表头", "normal", True, "CENTER"),
+    }
     def __init__(self, config_reader):
         self.config = config_reader
+        self._table_builders: dict[tuple, FastTableBuilder] = {}
+        # (配置键, 骨架文档)，以及骨架中需要填写的位置
+        self._skeleton: Optional[tuple[str, Document]] = None
+        self._skeleton_anchors: dict[str, int] = {}
+        # 后台预热和主线程可能同时要骨架
+        self._skeleton_lock = threading.Lock()
+        self._history = None
+
+    def warm_up_in_background(self) -> threading.Thread:
+        """在后台线程中导入 python-docx 并构建文档骨架，用户输入接龙的同时完成"""
+        thread = threading.Thread(target=self._new_document, name="docx-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    @profiler.timed("docx.create_leave_form")
+    def create_leave_form(self, students: List[StudentRecord], year: int, month: int, day: int,
+                          cause: str, leave_type: str = "evening", sink: Optional[OutputSink] = None):
+        """创建请假单文档，返回 sink 的写出结果（默认写到 output_settings.save_path，返回文件路径）"""
+        doc = self.build_leave_form(students, year, month, day, cause, leave_type)
+        if sink is None:
+            sink = self._default_sink()
 
-    def set_cell_shading(self, cell, shade: str):
-        """设置单元格底纹颜色"""
-        tcPr = cell._tc.get_or_add_tcPr()
-        shading = OxmlElement('w:shd')
-        shading.set(qn('w:fill'), shade)
-        tcPr.append(shading)
+        # 保存文件
+        result = self._save_document(doc, year, month, day, cause, sink)
+        self._record_history(students, year, month, day, cause, leave_type, sink)
+        return result
+
+    @profiler.timed("docx.create_leave_forms")
+    def create_leave_forms(self, students: List[StudentRecord], dates: List[tuple[int, int, int]],
+                           cause: str, leave_type: str = "evening", sink: Optional[OutputSink] = None) -> List[Any]:
+        """同一份名单生成多个日期的请假单，返回每个日期的写出结果
+
+        文档（包括名单表格）只构建一次，之后每个日期只改写时间行和落款日期再保存。
+        """
+        results = []
+        doc: Optional[Document] = None
+        if sink is None:
+            sink = self._default_sink()
+        for year, month, day in dates:
+            if doc is None:
+                doc = self.build_leave_form(students, year, month, day, cause, leave_type)
+            else:
+                self._add_title(doc, year, month, day, leave_type)
+                self._add_signature(doc, year, month, day)
+            results.append(self._save_document(doc, year, month, day, cause, sink))
+            self._record_history(students, year, month, day, cause, leave_type, sink)
+        return results
+
+    @profiler.timed("docx.create_combined_leave_form")
+    def create_combined_leave_form(self, grouped: Mapping[str, List[StudentRecord]], year: int, month: int,
+                                   day: int, cause: str, leave_type: str = "evening",
+                                   cover_summary: Optional[bool] = None, sink: Optional[OutputSink] = None):
+        """所有子分组合并成一份文档，返回 sink 的写出结果；cover_summary 默认取 output_settings.cover_summary"""
+        doc = self.build_combined_leave_form(grouped, year, month, day, cause, leave_type, cover_summary)
+        if sink is None:
+            sink = self._default_sink()
+        result = self._save_document(doc, year, month, day, cause, sink)
+        self._record_history([student for students in grouped.values() for student in students],
+                             year, month, day, cause, leave_type, sink)
+        return result
+
+    def _record_history(self, students: List[StudentRecord], year: int, month: int, day: int, cause: str,
+                        leave_type: str, sink: OutputSink):
+        """把落盘的假单记进历史库（只在内存中生成的不算）；写入失败只提示，不影响生成"""
+        if sink.output_dir is None or not self.config.get("history_settings.enabled", True):
+            return
+        try:
+            # 用到时才导入，交互模式启动时不需要 sqlite3
+            from leave_history import HistoryStore, history_db_path
+
+            db_path = history_db_path(self.config, sink.output_dir)
+            if self._history is None or self._history.db_path != db_path:
+                if self._history is not None:
+                    self._history.close()
+                self._history = HistoryStore(db_path)
+            self._history.record_form(students, year, month, day, cause, leave_type,
+                                      self.get_file_name(year, month, day, cause))
+        except Exception as e:
+            print(f"写入假单历史失败: {e}")
+
+    def build_combined_leave_form(self, grouped: Mapping[str, List[StudentRecord]], year: int, month: int,
+                                  day: int, cause: str, leave_type: str = "evening",
+                                  cover_summary: Optional[bool] = None) -> Document:
+        """每个子分组一节（分节符换页），样式只有一份；cover_summary 时首页列出各子分组人数
+
+        cover_summary 为 None 时取 output_settings.cover_summary。
+        """
+        from docx.oxml.ns import qn
+
+        if cover_summary is None:
+            cover_summary = self.config.get("output_settings.cover_summary", True)
+        if not grouped:
+            raise ValueError("没有需要生成的子分组")
+        combined: Optional[Document] = None
+        for 子分组, students in grouped.items():
+            doc = self.build_leave_form(students, year, month, day, f"{cause}{子分组}", leave_type)
+            if combined is None:
+                combined = doc
+                continue
+            # 各份假单来自同一个骨架，没有图片等关联部件，正文元素可以直接搬过来
+            body = combined.element.body
+            sectPr = body.add_section_break()
+            for element in list(doc.element.body):
+                if element.tag != qn("w:sectPr"):
+                    sectPr.addprevious(element)
+
+        if cover_summary:
+            self._add_cover_summary(combined, grouped, year, month, day, cause, leave_type)
+        return combined
+
+    def _add_cover_summary(self, doc: Document, grouped: Mapping[str, List[StudentRecord]], year: int,
+                           month: int, day: int, cause: str, leave_type: str):
+        """在文档最前面插入汇总页：各子分组人数和合计"""
+        body = doc.element.body
+        leave_text = self.config.get(f"leave_types.{leave_type}", "晚自习")
+        elements = [
+            doc.add_paragraph(f"{cause}请假汇总", style="假单标题")._p,
+            doc.add_paragraph(f"{leave_text} 请假时间：{year}年{month}月{day}日", style="假单小字")._p,
+        ]
+
+        builder = self._get_table_builder(doc, col_count=2)
+        rows = [builder.header_row(["子分组", "人数"])]
+        rows.extend(builder.body_row((子分组, str(len(students)))) for 子分组, students in grouped.items())
+        rows.append(builder.body_row(("合计", str(sum(len(students) for students in grouped.values())))))
+        elements.append(builder.build(rows))
+
+        # 汇总页自成一节
+        break_p = body.add_p()
+        break_p.set_sectPr(body.sectPr.clone())
+        elements.append(break_p)
+        for element in reversed(elements):
+            body.insert(0, element)
+
+    def build_leave_form(self, students: List[StudentRecord], year: int, month: int, day: int,
+                         cause: str, leave_type: str = "evening") -> Document:
+        """只在内存中构建请假单文档，不保存"""
+        doc = self._new_document()
 
-    def apply_font_settings(self, run, font_type: str = "normal"):
-        """应用字体设置"""
-        font_settings = self.config.get("font_settings", {})
-        font_name = font_settings.get(f"{font_type}_font", "等线")
-        font_size = font_settings.get("font_size", {}).get(font_type, 11)
+        # 添加标题
+        self._add_title(doc, year, month, day, leave_type)
+
+        # 添加正文内容
+        self._add_content(doc, cause, students)
 
-        run.font.name = font_name
-        run.font.size = Pt(font_size)
-        run.element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+        # 添加统计表格
+        self._add_statistics_table(doc, students)
+
+        # 添加签名部分
+        self._add_signature(doc, year, month, day)
+        return doc
+
+    def _skeleton_key(self) -> str:
+        """影响文档骨架的配置，变化后骨架需要重建"""
+        return json.dumps([self.config.get("college_name", "？？？？"), self.config.get("title_format", "%s"),
+                           self.config.get("font_settings", {})], ensure_ascii=False, sort_keys=True)
+
+    @profiler.timed("docx._new_document")
+    def _new_document(self) -> Document:
+        """从缓存的骨架深拷贝出一份新文档，骨架按配置只构建一次"""
+        key = self._skeleton_key()
+        with self._skeleton_lock:
+            if self._skeleton is None or self._skeleton[0] != key:
+                self._skeleton = (key, self._build_skeleton())
+            skeleton = self._skeleton[1]
+        doc = copy.deepcopy(skeleton)
+        # Document 缓存了 _Body，深拷贝时它指向的 body 会被单独复制一份、脱离新文档的元素树，
+        # 之后 doc.tables、doc.add_paragraph 都会落到那份副本上；清掉缓存让它按新文档重建
+        doc._Document__body = None
+        return doc
+
+    def _add_styles(self, doc: Document):
+        """按 font_settings 定义假单用到的段落样式，正文中的段落只引用样式，不再逐个 run 设置字体"""
+        from docx.enum.style import WD_STYLE_TYPE
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.oxml.ns import qn
+        from docx.shared import Pt
+
+        font_settings = self.config.get("font_settings", {})
+        for style_id, (style_name, font_type, bold, alignment) in self.leave_form_styles.items():
+            font_name = font_settings.get(f"{font_type}_font", "等线")
+            font_size = font_settings.get("font_size", {}).get(font_type, 11)
+
+            style = doc.styles.add_style(style_name, WD_STYLE_TYPE.PARAGRAPH)
+            style.style_id = style_id
+            style.base_style = doc.styles['Normal']
+            style.font.name = font_name
+            style.font.size = Pt(font_size)
+            style.element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+            if bold:
+                style.font.bold = True
+            if alignment is not None:
+                style.paragraph_format.alignment = getattr(WD_ALIGN_PARAGRAPH, alignment)
+
+    def _new_blank_document(self) -> Document:
+        """只设置了默认字体和假单段落样式的空白文档"""
+        from docx import Document
+        from docx.oxml.ns import qn
+        from docx.shared import Pt
 
-    def create_leave_form(self, students: List[Tuple[str, str]], year: int, month: int, day: int,
-                          cause: str, leave_type: str = "evening"):
-        """创建请假单文档"""
         doc = Document()
 
-        # 设置默认样式
+        # 设置默认样式，签名等没有单独样式的段落沿用它
         style = doc.styles['Normal']
         font = style.font
         normal_font = self.config.get("font_settings.normal_font", "等线")
@@ -43,39 +240,68 @@ class DocumentGenerator:
         font.name = normal_font
         font.size = Pt(normal_size)
         font.element.rPr.rFonts.set(qn('w:eastAsia'), normal_font)
+        self._add_styles(doc)
+        return doc
 
-        # 添加标题
-        self._add_title(doc, year, month, day, leave_type)
+    def _build_skeleton(self) -> Document:
+        """构建每份假单都相同的部分：样式、标题、时间行、问候语、签名，日期、原因和表格留待填写"""
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Inches
 
-        # 添加正文内容
-        self._add_content(doc, cause, students)
+        doc = self._new_blank_document()
 
-        # 添加统计表格
-        self._add_statistics_table(doc, students)
+        # 标题
+        college_name = self.config.get("college_name", "？？？？")
+        title_format = self.config.get("title_format", "%s")
+        doc.add_paragraph(title_format % college_name, style="假单标题")
 
-        # 添加签名部分
-        self._add_signature(doc, year, month, day)
+        # 时间部分（勾选框和日期在 _add_title 中填写）
+        time_para = doc.add_paragraph("请假时间", style="假单小字")
 
-        # 保存文件
-        return self._save_document(doc, year, month, day, cause)
+        # 问候语
+        doc.add_paragraph("各班级：", style="假单正文")
 
-    def _add_title(self, doc: Document, year: int, month: int, day: int, leave_type: str):
-        """添加标题部分"""
-        college_name = self.config.get("college_name", "？？？？")
-        title_format = self.config.get("title_format", "%s")
+        # 请假原因（在 _add_content 中填写），学生表格插在它后面
+        reason = doc.add_paragraph("请假原因", style="假单正文")
+        reason.paragraph_format.first_line_indent = Inches(0.3)
+
+        # 统计表格插在它后面
+        statistics = doc.add_paragraph("经整合：")
+
+        # 签名部分（日期在 _add_signature 中填写）
+        doc.add_paragraph()
+        signature = doc.add_paragraph(college_name)
+        signature.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+        date = doc.add_paragraph("落款日期")
+        date.alignment = WD_ALIGN_PARAGRAPH.RIGHT
 
-        title = doc.add_paragraph()
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        title_run = title.add_run(title_format % college_name)
-        title_run.bold = True
-        self.apply_font_settings(title_run, "title")
+        doc.add_paragraph()
+        responsible = doc.add_paragraph("负责人签名：__________________")
+        responsible.alignment = WD_ALIGN_PARAGRAPH.RIGHT
 
-        # 时间部分
-        time_para = doc.add_paragraph()
-        time_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+        doc.add_paragraph()
+        teacher = doc.add_paragraph("指导老师签名：__________________")
+        teacher.alignment = WD_ALIGN_PARAGRAPH.RIGHT
 
-        leave_types = self.config.get("leave_types", {})
-        leave_text = leave_types.get(leave_type, "晚自习")
+        # 记录需要填写的位置：表格之前的按正数下标，表格之后的按倒数下标，插入表格后仍然有效
+        body = doc.element.body
+        self._skeleton_anchors = {
+            "time": body.index(time_para._p),
+            "reason": body.index(reason._p),
+            "statistics": body.index(statistics._p) - len(body),
+            "date": body.index(date._p) - len(body),
+        }
+        return doc
+
+    def _skeleton_anchor(self, doc: Document, name: str):
+        """取骨架中预留位置的段落元素"""
+        return doc.element.body[self._skeleton_anchors[name]]
+
+    @profiler.timed("docx._add_title")
+    def _add_title(self, doc: Document, year: int, month: int, day: int, leave_type: str):
+        """填写标题下的时间行"""
+        leave_text = self.config.get(f"leave_types.{leave_type}", "晚自习")
         time_text: str
         if leave_type == "morning":
             time_text = f"☑早自习 □晚自习 请假时间：{year}年{month}月{day}日"
@@ -84,173 +310,100 @@ class DocumentGenerator:
         else:
             time_text = f"□早自习 ☑晚自习? 请假时间：{year}年{month}月{day}日"
 
-        time_run = time_para.add_run(time_text)
-        self.apply_font_settings(time_run, "small")
+        self._skeleton_anchor(doc, "time").r_lst[0].text = time_text
 
-    def _add_content(self, doc: Document, cause: str, students: List[Tuple[str, str]]):
-        """添加正文内容"""
-        # 问候语
-        greeting = doc.add_paragraph()
-        greeting_run = greeting.add_run("各班级：")
-        self.apply_font_settings(greeting_run, "content")
-
-        # 请假原因
-        reason = doc.add_paragraph()
-        reason.paragraph_format.first_line_indent = Inches(0.3)
-        reason_run = reason.add_run(f"因{cause}工作需要，以下同学需请假。")
-        self.apply_font_settings(reason_run, "content")
+    def _add_content(self, doc: Document, cause: str, students: List[StudentRecord]):
+        """填写请假原因并添加学生表格"""
+        self._skeleton_anchor(doc, "reason").r_lst[0].text = f"因{cause}工作需要，以下同学需请假。"
 
         # 学生表格
         self._add_students_table(doc, students)
 
-    def _add_students_table(self, doc: Document, students: List[Tuple[str, str]]):
+    def _get_table_builder(self, doc: Document, col_count: int = 6) -> FastTableBuilder:
+        """按列数、当前版面宽度和底纹配置取（或创建）表格构建器"""
+        from docx.shared import Emu
+
+        section = doc.sections[-1]
+        block_width = section.page_width - section.left_margin - section.right_margin
+        col_width_twips = Emu(block_width // col_count).twips
+        shading_color = self.config.get("table_settings.header_shading", "D9D9D9")
+
+        key = (col_count, col_width_twips, shading_color)
+        builder = self._table_builders.get(key)
+        if builder is None:
+            builder = FastTableBuilder(col_count, col_width_twips, shading_color,
+                                       body_style_id="LeaveTableBody", header_style_id="LeaveTableHeader")
+            self._table_builders[key] = builder
+        return builder
+
+    @profiler.timed("docx._add_students_table")
+    def _add_students_table(self, doc: Document, students: List[StudentRecord]):
         """添加学生信息表格"""
-        students.sort(key=lambda x: (x[0][:2], x[0][2:]))
+        students.sort(key=attrgetter("完整班级名"))
         num_students = len(students)
         num_rows = (num_students + 1) // 2 + 1
+        half = num_rows - 1
 
-        table = doc.add_table(rows=num_rows, cols=6)
-        table.style = 'Table Grid'
+        builder = self._get_table_builder(doc)
+        rows = [builder.header_row(["序号", "班级", "姓名", "序号", "班级", "姓名"])]
+        for left_idx in range(half):
+            left = students[left_idx]
+            right_idx = left_idx + half
+            if right_idx < num_students:
+                right = students[right_idx]
+                rows.append(builder.body_row((str(left_idx + 1), left.完整班级名, left.姓名,
+                                              str(right_idx + 1), right.完整班级名, right.姓名)))
+            else:
+                rows.append(builder.body_row((str(left_idx + 1), left.完整班级名, left.姓名, None, None, None)))
 
-        headers = ["序号", "班级", "姓名", "序号", "班级", "姓名"]
-        hdr_cells = table.rows[0].cells
-        shading_color = self.config.get("table_settings.header_shading", "D9D9D9")
+        self._skeleton_anchor(doc, "reason").addnext(builder.build(rows))
 
-        for i, header in enumerate(headers):
-            hdr_cells[i].text = header
-            for paragraph in hdr_cells[i].paragraphs:
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                for run in paragraph.runs:
-                    run.bold = True
-                    self.apply_font_settings(run)
-            self.set_cell_shading(hdr_cells[i], shading_color)
-
-        # 填充学生数据
-        for i in range(num_rows - 1):
-            row_idx = i + 1
-            row_cells = table.rows[row_idx].cells
-
-            left_idx = i
-            if left_idx < num_students:
-                class1, name1 = students[left_idx]
-                row_cells[0].text = str(left_idx + 1)
-                row_cells[1].text = class1
-                row_cells[2].text = name1
-
-            right_idx = i + (num_rows - 1)
-            if right_idx < num_students:
-                class2, name2 = students[right_idx]
-                row_cells[3].text = str(right_idx + 1)
-                row_cells[4].text = class2
-                row_cells[5].text = name2
-
-            for cell in row_cells:
-                for paragraph in cell.paragraphs:
-                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    for run in paragraph.runs:
-                        self.apply_font_settings(run)
-
-    def _add_statistics_table(self, doc: Document, students: List[Tuple[str, str]]):
+    @profiler.timed("docx._add_statistics_table")
+    def _add_statistics_table(self, doc: Document, students: List[StudentRecord]):
         """添加统计表格"""
-        doc.add_paragraph("经整合：")
-
-        # 统计各班人数
-        class_counts = {}
-        for class_name, _ in students:
-            if class_name not in class_counts:
-                class_counts[class_name] = 0
-            class_counts[class_name] += 1
-
-        num_classes = len(class_counts)
-        stat_rows = (num_classes + 1) // 2 + 2
-        stat_table = doc.add_table(rows=stat_rows, cols=6)
-        stat_table.style = 'Table Grid'
-
-        stat_headers = ["班级", "请假总人数", "备注", "班级", "请假总人数", "备注"]
-        stat_hdr_cells = stat_table.rows[0].cells
-        shading_color = self.config.get("table_settings.header_shading", "D9D9D9")
 
-        for i, header in enumerate(stat_headers):
-            stat_hdr_cells[i].text = header
-            for paragraph in stat_hdr_cells[i].paragraphs:
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                for run in paragraph.runs:
-                    run.bold = True
-                    self.apply_font_settings(run)
-            self.set_cell_shading(stat_hdr_cells[i], shading_color)
+        # 统计各班人数（按首次出现的顺序）
+        class_counts = Counter(map(attrgetter("完整班级名"), students))
+
+        builder = self._get_table_builder(doc)
+        rows = [builder.header_row(["班级", "请假总人数", "备注", "班级", "请假总人数", "备注"])]
 
         # 填充统计数据
         class_list = list(class_counts.items())
         for i in range(0, len(class_list), 2):
-            row_idx = i // 2 + 1
-            row_cells = stat_table.rows[row_idx].cells
-
             class1, count1 = class_list[i]
-            row_cells[0].text = class1
-            row_cells[1].text = str(count1)
-
             if i + 1 < len(class_list):
                 class2, count2 = class_list[i + 1]
-                row_cells[3].text = class2
-                row_cells[4].text = str(count2)
-
-            for cell in row_cells:
-                for paragraph in cell.paragraphs:
-                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    for run in paragraph.runs:
-                        self.apply_font_settings(run)
+                rows.append(builder.body_row((class1, str(count1), None, class2, str(count2), None)))
+            else:
+                rows.append(builder.body_row((class1, str(count1), None, None, None, None)))
 
         # 总计行
-        total_row = stat_table.rows[stat_rows - 1].cells
-        total_row[3].text = "总计"
-        total_row[4].text = str(len(students))
-
-        for i in [0, 1, 3, 4]:
-            for paragraph in total_row[i].paragraphs:
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                for run in paragraph.runs:
-                    run.bold = True if i in [0, 3] else False
-                    self.apply_font_settings(run)
-        self.set_cell_shading(total_row[3], shading_color)
-
-    def _add_signature(self, doc: Document, year: int, month: int, day: int):
-        """添加签名部分"""
-        college_name = self.config.get("college_name", "？？？？")
-
-        doc.add_paragraph()
-        signature = doc.add_paragraph(college_name)
-        signature.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        for run in signature.runs:
-            self.apply_font_settings(run)
-
-        date = doc.add_paragraph(f"{year}年{month}月{day}日")
-        date.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        for run in date.runs:
-            self.apply_font_settings(run)
-
-        doc.add_paragraph()
-        responsible = doc.add_paragraph("负责人签名：__________________")
-        responsible.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        for run in responsible.runs:
-            self.apply_font_settings(run)
+        rows.append(builder.statistics_total_row(len(students)))
 
-        doc.add_paragraph()
-        teacher = doc.add_paragraph("指导老师签名：__________________")
-        teacher.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        for run in teacher.runs:
-            self.apply_font_settings(run)
+        self._skeleton_anchor(doc, "statistics").addnext(builder.build(rows))
 
-    def _save_document(self, doc: Document, year: int, month: int, day: int, cause: str) -> LiteralString | str | bytes:
+    @profiler.timed("docx._add_signature")
+    def _add_signature(self, doc: Document, year: int, month: int, day: int):
+        """填写签名部分的落款日期"""
+        self._skeleton_anchor(doc, "date").r_lst[0].text = f"{year}年{month}月{day}日"
+
+    def get_file_name(self, year: int, month: int, day: int, cause: str) -> str:
+        """按 output_settings.file_name_format 生成文件名"""
+        file_name_format = self.config.get(
+            "output_settings.file_name_format", "{year}年{month}月{day}日_{cause}假单.docx")
+        return file_name_format.format(year=year, month=month, day=day, cause=cause)
+
+    @profiler.timed("docx._save_document")
+    def _save_document(self, doc: Document, year: int, month: int, day: int, cause: str,
+                       sink: Optional[OutputSink] = None) -> Any:
         """保存文档"""
-        output_settings = self.config.get("output_settings", {})
-        save_path = output_settings.get("save_path", "desktop")
-        file_name_format = output_settings.get("file_name_format", "{year}年{month}月{day}日_{cause}假单.docx")
-
-        if save_path == "desktop":
-            save_path = os.path.join(os.path.expanduser("~"), "Desktop")
+        if sink is None:
+            sink = self._default_sink()
 
-        file_name = file_name_format.format(year=year, month=month, day=day, cause=cause)
-        file_path = os.path.join(save_path, file_name)
+        with profiler.stage("docx.write"):
+            return sink.write(doc, self.get_file_name(year, month, day, cause))
 
-        doc.save(file_path)
-        return file_path
\ No newline at end of file
+    def _default_sink(self) -> FileSystemSink:
+        """默认写到 output_settings.save_path"""
+        return FileSystemSink(self.config.get("output_settings.save_path", "desktop"))
@@ -0,0 +1,260 @@
+"""本地假单生成服务：粘贴接龙，直接拿回 .docx
+
+基于 asyncio 的极简 HTTP/1.1 服务，没有第三方依赖。进程常驻，配置、正则、专业名自动机和文档骨架
+只准备一次；解析和 python-docx 的构建放到线程池里执行，多个请求同时到达也不会互相卡住事件循环。
+文档全程在内存中构建，不落盘。
+
+接口：
+    GET  /health        返回 ok
+    POST /leave-form    请求体第一行是日期表达式（同交互模式，如 "td+1"、"week+1 1"），其余是接龙原文；
+                        也可以发 JSON：{"date": ..., "text": ..., "cause": ..., "leave_type": ...}
+                        查询参数 cause / leave_type 可覆盖配置，format=zip 强制打包
+    只有一个子分组时返回单个 .docx，多个子分组时返回按子分组生成的 zip。
+
+用法示例：
+    python http_service.py --port 8765
+    curl --data-binary @接龙.txt "http://127.0.0.1:8765/leave-form?cause=DH部" -o 假单
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+from config_reader import ConfigReader
+from docx_generator import DocumentGenerator
+from input_handler import 分组多输出输入器, print_red
+from output_sinks import BytesIOSink, ZipSink
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+ZIP_CONTENT_TYPE = "application/zip"
+
+MAX_HEADERS = 100
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """带 HTTP 状态码的请求错误，消息原样返回给客户端"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LeaveFormService:
+    """常驻的假单生成服务"""
+
+    def __init__(self, config_reader: ConfigReader, workers: int = 4,
+                 max_body_bytes: int = 4 * 1024 * 1024, read_timeout: float = 30.0):
+        self.config_reader = config_reader
+        self.handler = 分组多输出输入器(config_reader=config_reader)
+        self.max_body_bytes = max_body_bytes
+        self.read_timeout = read_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="leave-form")
+        # 文档骨架是按实例缓存的 lxml 树，每个工作线程各用一个 DocumentGenerator，不共享
+        self._local = threading.local()
+
+    def _get_docx_generator(self) -> DocumentGenerator:
+        docx_generator = getattr(self._local, "docx_generator", None)
+        if docx_generator is None:
+            docx_generator = self._local.docx_generator = DocumentGenerator(self.config_reader)
+        return docx_generator
+
+    def generate(self, date_expression: str, text: str, cause: Optional[str] = None,
+                 leave_type: str = "evening", force_zip: bool = False) -> tuple[str, str, bytes]:
+        """解析、分组并在内存中生成假单，返回 (文件名, Content-Type, 内容)（在线程池中执行）"""
+        try:
+            year, month, day = self.handler._get_ymd_time_by_str_save(date_expression)
+        except ValueError as e:
+            raise RequestError(400, str(e)) from e
+        if cause is None:
+            cause = self.config_reader.get("cause", "？？部")
+        if leave_type not in ("morning", "evening"):
+            raise RequestError(400, f"未知的请假类型: {leave_type}")
+
+        grouped = self.handler._group_stu_data_by_子分组(
+            self.handler._iter_stu_data_match_result_from_source(text.splitlines()))
+        if not grouped:
+            raise RequestError(422, "没有解析到学生数据（接龙需要从 \"1.\" 开头的行开始）")
+
+        docx_generator = self._get_docx_generator()
+        if len(grouped) == 1 and not force_zip:
+            (子分组, stu_data), = grouped.items()
+            group_cause = f"{cause}{子分组}"
+            content = docx_generator.create_leave_form(stu_data, year, month, day, group_cause, leave_type,
+                                                       sink=BytesIOSink())
+            return docx_generator.get_file_name(year, month, day, group_cause), DOCX_CONTENT_TYPE, content
+
+        # 各子分组的假单直接依次写进同一个 zip
+        with ZipSink() as sink:
+            for 子分组, stu_data in grouped.items():
+                docx_generator.create_leave_form(stu_data, year, month, day, f"{cause}{子分组}", leave_type,
+                                                 sink=sink)
+        # zip 的文件名同样按 output_settings.file_name_format，只换扩展名
+        zip_name = f"{os.path.splitext(docx_generator.get_file_name(year, month, day, cause))[0]}.zip"
+        return zip_name, ZIP_CONTENT_TYPE, sink.getvalue()
+
+    @staticmethod
+    def _parse_body(body: bytes, content_type: str, query: dict[str, list[str]]) -> dict[str, Any]:
+        """请求体 + 查询参数 -> generate 的参数"""
+        try:
+            body_text = body.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            raise RequestError(400, "请求体需要是 UTF-8 编码") from e
+
+        if "json" in content_type:
+            try:
+                data = json.loads(body_text)
+            except json.JSONDecodeError as e:
+                raise RequestError(400, f"JSON 格式错误: {e}") from e
+            if not isinstance(data, dict):
+                raise RequestError(400, "JSON 请求体需要是对象")
+            date_expression, text = str(data.get("date", "")), str(data.get("text", ""))
+            cause, leave_type = data.get("cause"), data.get("leave_type", "evening")
+        else:
+            date_expression, _, text = body_text.partition("\n")
+            cause, leave_type = None, "evening"
+
+        if not date_expression.strip():
+            raise RequestError(400, "缺少日期表达式（请求体第一行）")
+        if "cause" in query:
+            cause = query["cause"][-1]
+        if "leave_type" in query:
+            leave_type = query["leave_type"][-1]
+        return {"date_expression": date_expression.strip(), "text": text, "cause": cause,
+                "leave_type": leave_type, "force_zip": query.get("format", [""])[-1] == "zip"}
+
+    @staticmethod
+    async def _readline(reader: asyncio.StreamReader) -> bytes:
+        """读一行；超过 StreamReader 的行长度上限时按请求过大处理，而不是落到 500"""
+        try:
+            return await reader.readline()
+        except (asyncio.LimitOverrunError, ValueError) as e:
+            raise RequestError(413, "请求行或请求头过长") from e
+
+    async def _read_request(self, reader: asyncio.StreamReader
+                            ) -> tuple[str, str, dict[str, list[str]], dict[str, str], bytes]:
+        """读取一个请求，返回 (方法, 路径, 查询参数, 请求头, 请求体)"""
+        # 查询参数里可能直接带着未转义的中文（如 ?cause=DH部）
+        request_line = (await self._readline(reader)).decode("utf-8", errors="replace").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise RequestError(400, "请求行格式错误")
+        method, target, _ = parts
+
+        headers: dict[str, str] = {}
+        while True:
+            line = (await self._readline(reader)).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise RequestError(413, f"请求头超过 {MAX_HEADERS} 个")
+            name, separator, value = line.partition(":")
+            if not separator:
+                raise RequestError(400, f"请求头格式错误: {line.strip()}")
+            headers[name.strip().lower()] = value.strip()
+
+        body = b""
+        if method == "POST":
+            if "content-length" not in headers:
+                raise RequestError(411, "需要 Content-Length")
+            try:
+                length = int(headers["content-length"])
+            except ValueError as e:
+                raise RequestError(400, "Content-Length 格式错误") from e
+            if length < 0:
+                raise RequestError(400, "Content-Length 格式错误")
+            if length > self.max_body_bytes:
+                raise RequestError(413, f"请求体超过 {self.max_body_bytes} 字节")
+            body = await reader.readexactly(length)
+
+        url = urlsplit(target)
+        return method, url.path, parse_qs(url.query), headers, body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理一个连接上的一个请求，响应后关闭连接"""
+        try:
+            try:
+                method, path, query, headers, body = await asyncio.wait_for(
+                    self._read_request(reader), self.read_timeout)
+                if path == "/health":
+                    response = (200, "text/plain; charset=utf-8", b"ok", None)
+                elif path != "/leave-form":
+                    raise RequestError(404, f"没有这个接口: {path}")
+                elif method != "POST":
+                    raise RequestError(405, "请用 POST 提交接龙")
+                else:
+                    kwargs = self._parse_body(body, headers.get("content-type", ""), query)
+                    loop = asyncio.get_running_loop()
+                    file_name, content_type, content = await loop.run_in_executor(
+                        self.executor, lambda: self.generate(**kwargs))
+                    response = (200, content_type, content, file_name)
+            except RequestError as e:
+                response = (e.status, "text/plain; charset=utf-8", str(e).encode("utf-8"), None)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                response = (408, "text/plain; charset=utf-8", "请求读取超时或不完整".encode("utf-8"), None)
+            except Exception as e:
+                print_red(f"生成请假单时发生错误: {e}")
+                response = (500, "text/plain; charset=utf-8", f"生成请假单时发生错误: {e}".encode("utf-8"), None)
+            writer.write(self._format_response(*response))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _format_response(status: int, content_type: str, content: bytes, file_name: Optional[str]) -> bytes:
+        header_lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                        f"Content-Type: {content_type}",
+                        f"Content-Length: {len(content)}",
+                        "Connection: close"]
+        if file_name is not None:
+            # 文件名是中文，按 RFC 5987 给出 UTF-8 版本，再附一个 ASCII 兜底
+            ascii_name = "leave_form.zip" if file_name.endswith(".zip") else "leave_form.docx"
+            header_lines.append(f"Content-Disposition: attachment; filename=\"{ascii_name}\"; "
+                                f"filename*=UTF-8''{quote(file_name)}")
+        return ("\r\n".join(header_lines) + "\r\n\r\n").encode("latin-1") + content
+
+    def warm_up(self) -> None:
+        """预先编译正则、构建专业名自动机和文档骨架，第一个请求不用等"""
+        self.handler._group_stu_data_by_子分组(
+            self.handler._iter_stu_data_match_result_from_source(self.handler._get_接龙输入().splitlines()))
+        self.executor.submit(lambda: self._get_docx_generator()._new_document()).result()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"假单生成服务已启动: {addresses}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="本地假单生成 HTTP 服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("-p", "--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("-c", "--config", default="config.json", help="配置文件路径")
+    parser.add_argument("-j", "--workers", type=int, default=4, help="生成文档的线程数")
+    args = parser.parse_args(argv)
+
+    service = LeaveFormService(ConfigReader(args.config), workers=args.workers)
+    service.warm_up()
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("服务已停止")
+    finally:
+        service.executor.shutdown(wait=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,12 +5,21 @@ from abc import ABC, abstractmethod
 from collections import defaultdict
 from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Any, Optional, Self, Iterable
+from typing import Any, Callable, Optional, Self, Iterable, Mapping
 
 import chinese_to_int
+import jielong_reader
+import jielong_tokenizer
+import parser_registry
 from chinese_to_int import chinese_to_int_op, int_to_chinese_op
 from config_reader import ConfigReader
 from docx_generator import DocumentGenerator
+from jielong_session import JielongSession, SessionChanges
+from major_resolver import MajorResolver, get_resolver
+from output_manifest import OutputManifest, combine_hashes, leave_form_hash
+from output_sinks import resolve_save_path
+from profiling import profiler
+from student_record import StudentRecord
 
 def print_red(text:str) -> None:
     print(f"\033[91m{text}\033[0m")
@@ -60,11 +69,22 @@ class ABC_输入器(ABC):
     config_reader: ConfigReader
     docx_generator: Optional[DocumentGenerator]
 
-    def for_mat_docx_and_pushout(self, *args, **kwargs) -> None:
+    def for_mat_docx_and_pushout(self, *args, **kwargs) -> Any:
+        """生成一份假单，返回 create_leave_form 的结果，出错时返回 None"""
         try:
-            self.docx_generator.create_leave_form(*args, **kwargs)
+            return self.docx_generator.create_leave_form(*args, **kwargs)
         except Exception as e:
             print(f"生成请假单时发生错误: {e}")
+            return None
+
+    def for_mat_docx_and_pushout_dates(self, students: list[StudentRecord], dates: list[tuple[int, int, int]],
+                                       **kwargs) -> list[Any]:
+        """同一份名单生成多个日期的假单，返回每个日期的结果，出错时返回空列表"""
+        try:
+            return self.docx_generator.create_leave_forms(students, dates, **kwargs)
+        except Exception as e:
+            print(f"生成请假单时发生错误: {e}")
+            return []
 
     def __init__(self, config_reader: Optional[ConfigReader] = None):
         if config_reader is None:
@@ -76,6 +96,8 @@ class ABC_输入器(ABC):
     def main(self) -> None:
         if self.docx_generator is None:
             raise ValueError("DocumentGenerator 未初始化")
+        # 用户输入日期和接龙的同时，在后台加载 python-docx、构建文档骨架
+        self.docx_generator.warm_up_in_background()
         try:
             self._main()
         except Exception as e:
@@ -163,7 +185,7 @@ DH部
         cause = input("计信学院因xxx工作需要，以下同学需请假。(例：DH部)")
         input_time = input_time.split(".")
         year, month, day = int(input_time[0]), int(input_time[1]), int(input_time[2])
-        stu_data:list[tuple[str,str]] = self.parse_student_data(self.get_student_input())
+        stu_data:list[StudentRecord] = self.parse_student_data(self.get_student_input())
 
         self.for_mat_docx_and_pushout(stu_data, year=year, month=month, day=day, cause=cause)
         return 0
@@ -180,11 +202,12 @@ DH部
             lines.append(line)
         return "\n".join(lines)
 
-    @staticmethod
-    def parse_student_data(input_str: str):
+    def parse_student_data(self, input_str: str) -> list[StudentRecord]:
         """使用正则表达式解析学生数据"""
-        pattern = r'(?:^\d+\.\s*)?(\d{2})(云计算|计算机应用技术|计应|大数据技术|大数据|网络技术|网络|软件技术|软件|人工智能技术应用|人工智能|数字媒体技术班|数字媒体技术|数字媒体|数媒|电竞)(五年制)?(单)?(?:(\d+)(?:班|班级)?)?\s*?([\u4e00-\u9fa5]+)'
-        matches = re.findall(pattern, input_str)
+        class_mappings = self.config_reader.get("class_mappings", {})
+        pattern = parser_registry.get_pattern("经典输入", class_mappings)
+        major_resolver = get_resolver(class_mappings)
+        matches = pattern.findall(input_str)
         students = []
         for match in matches:
             grade = match[0]  # 年级
@@ -194,31 +217,23 @@ DH部
             class_num = match[4] if match[4] else ''  # 阿拉伯数字班级号
             name = match[5].strip()  # 姓名
             modifiers = is_five_year + is_single_class
-            class_mapping = {
-                '网络技术': '网络',
-                '计算机应用': '计应',
-                '软件技术': '软件',
-                '云计算': '云计算',
-                '电子竞技': '电竞',
-                '人工智能': '人工智能',
-                '人工智能技术应用': '人工智能',
-                '大数据技术': '大数据',
-                '数字媒体': '数媒',
-            }
-            full_base_class = base_class
-            for short, full in class_mapping.items():
-                if short in base_class:
-                    full_base_class = full
-                    break
-            class_name = full_base_class + modifiers + class_num
-            full_class = f"{grade}{class_name}"
-            students.append((full_class, name))
-            print(f"{grade}{class_name} {name}")
+            full_base_class = major_resolver.resolve(base_class) or base_class
+            student = StudentRecord("", grade, "", full_base_class + modifiers, class_num, name)
+            students.append(student)
+            print(f"{student.完整班级名} {name}")
         return students
 
 
+@parser_registry.register("经典输入")
+def _build_经典输入_pattern(class_mappings: Mapping[str, str]) -> str:
+    """专业名分支由 class_mappings 生成，长的在前"""
+    return (r'(?:^\d+\.\s*)?(\d{2})(%s)(五年制)?(单)?(?:(\d+)(?:班|班级)?)?\s*?([\u4e00-\u9fa5]+)'
+            % parser_registry.major_alternation(class_mappings))
+
 
 class 我的输入器(ABC_输入器):
+    # 日期列表里用逗号分隔年月日的完整日期，如 "2020,12,1"
+    comma_date_pattern = re.compile(r"(?<!\d)(\d{4})\s*[,，]\s*(\d{1,2})\s*[,，]\s*(\d{1,2})(?!\d)")
 
     # def test_日期输入器(self):
         # input_string_arr: dict[str, datetime.date] = {
@@ -294,6 +309,61 @@ class 我的输入器(ABC_输入器):
 
         return self._get_ymd_time_by_str_save_经典(input_string)
 
+    def _get_ymd_times_by_str_save(self, input_string: str, base_date: Optional[datetime] = None
+                                   ) -> list[tuple[int, int, int]]:
+        """
+        解析日期列表和日期范围，每一项的写法同 _get_ymd_time_by_str_save
+
+        支持格式：
+        - 逗号列表: "td+1, td+3", "2020-7-1，2020-7-3"
+        - 范围（含两端）: "td..td+6", "2020-7-1..2020-7-5"
+        - 一周内的范围: "week+1 1..5", "w 1..0"
+        逗号也可以是单个日期里的分隔符（"2020,12,1"、"2020,7,1..2020,7,3"）：先把这种完整的年月日
+        改写成 "2020-12-1"，剩下的逗号才是列表分隔符。
+        重复的日期只保留第一次出现的位置。
+
+        Raises:
+            ValueError: 当无法解析日期、范围结束早于开始或范围超过一年时
+        """
+        input_string = self.comma_date_pattern.sub(r"\1-\2-\3", input_string)
+        dates: list[tuple[int, int, int]] = []
+        for item in re.split(r"[,，]", input_string):
+            if item.strip():
+                dates.extend(self._parse_date_item(item.strip(), base_date))
+        if not dates:
+            raise ValueError("没有输入日期")
+        return list(dict.fromkeys(dates))
+
+    def _parse_date_item(self, item: str, base_date: Optional[datetime] = None) -> list[tuple[int, int, int]]:
+        """日期列表中的一项：单个日期或范围"""
+        if ".." in item:
+            return self._expand_date_range(item, base_date)
+        return [self._get_ymd_time_by_str_save(item, base_date)]
+
+    def _expand_date_range(self, item: str, base_date: Optional[datetime] = None
+                           ) -> list[tuple[int, int, int]]:
+        """把 "开始..结束" 展开成逐日的列表"""
+        week_range_match = re.match(r'^((?:week|w)\s*(?:[+-]\s*\d+)?)\s*([0-7])\s*\.\.\s*([0-7])$', item.lower())
+        if week_range_match:
+            week_prefix, start_weekday, end_weekday = week_range_match.groups()
+            start = self._get_ymd_time_by_str_save(f"{week_prefix} {start_weekday}", base_date)
+            end = self._get_ymd_time_by_str_save(f"{week_prefix} {end_weekday}", base_date)
+        else:
+            start_string, _, end_string = item.partition("..")
+            start = self._get_ymd_time_by_str_save(start_string, base_date)
+            end = self._get_ymd_time_by_str_save(end_string, base_date)
+
+        try:
+            start_date, end_date = datetime(*start), datetime(*end)
+        except ValueError as e:
+            raise ValueError(f"日期范围 {item} 中有不存在的日期: {e}") from e
+        days = (end_date - start_date).days
+        if days < 0:
+            raise ValueError(f"日期范围的结束早于开始: {item}")
+        if days > 366:
+            raise ValueError(f"日期范围超过一年: {item}")
+        return [(d.year, d.month, d.day) for d in (start_date + timedelta(days=i) for i in range(days + 1))]
+
     def _get_ymd_time_by_str_save_经典(self, input_time_string: str
                                        ) -> tuple[int, int, int]:
         year: int = 0
@@ -309,28 +379,49 @@ class 我的输入器(ABC_输入器):
             return year, month, day
 
     pattern_one_cn_num = f"[\\d{chinese_to_int.all_chinese_num}]"
+    # 学年、班级号的位值写法（二十五、十二）：x?十x?；专业名不吃进它的开头，留给班级号
+    pattern_cn_positional = f"%s?[{chinese_to_int.ten_chars}]%s?" % (pattern_one_cn_num, pattern_one_cn_num)
     pattern_sep_char = r"[\s,-;，-；_]"
     pattern = (
-            r'^(?:\d+\.\s*)?([\u4e00-\u9fa5]+组)?(%s{2})\s*(?:(%s?)年制)?\s*([^,-;，-；\s班]+)\s*(?:(\d+)?(?:班|班级)?)?\s*[,-;，-；\s]\s*([\u4e00-\u9fa5]{1,8})'
-            % (pattern_one_cn_num, pattern_one_cn_num)
+            r'^(?:\d+\.\s*)?([\u4e00-\u9fa5]+组)?(%s[%s]%s?|%s{2})\s*(?:(%s?)年制)?\s*((?:(?!%s?[%s])[^,-;，-；\s班])+)\s*(?:(\d+|%s)?(?:班|班级)?)?\s*[,-;，-；\s]\s*([\u4e00-\u9fa5]{1,8})'
+            % (pattern_one_cn_num, chinese_to_int.ten_chars, pattern_one_cn_num, pattern_one_cn_num,
+               pattern_one_cn_num, pattern_one_cn_num, chinese_to_int.ten_chars, pattern_cn_positional)
     )
+    compiled_pattern = parser_registry.compile_pattern(pattern)
+    # 长行交给线性时间的分词器（结果与正则相同）；短行回溯的代价有上限，仍用更快的正则
+    regex_max_line_length = 32
+
     @staticmethod
     def __to_tuple6_str(v:Any) -> tuple[str, str, str, str, str, str]:
         return v
 
+    @classmethod
+    def _match_groups(cls, text: str) -> Optional[tuple[str, ...]]:
+        """pattern 的六个分组（没匹配到的为空串），匹配失败返回 None"""
+        if len(text) > cls.regex_max_line_length:
+            return jielong_tokenizer.tokenize_line(text)
+        match_result = cls.compiled_pattern.match(text)
+        return match_result.groups("") if match_result else None
+
     @classmethod
     def _match_line(cls, text: str) -> Optional[tuple[str, ...]]:
-        match_result = re.match(cls.pattern, text)
-        if not match_result:
+        groups = cls._match_groups(text)
+        if not groups:
             return None
-        assert len(match_result.groups()) == 6
-        result = cls.__to_tuple6_str(tuple((group if group is not None else "") for group in match_result.groups()))
+        result = cls.__to_tuple6_str(groups)
         学年 = chinese_to_int_op(result[1]) or ""
         年制 = result[2] if not result[2].isdigit() else int_to_chinese_op(int(result[2])) or ""
-        班级号 = result[4] if not result[4].isdigit() else int_to_chinese_op(int(result[4])) or ""
+        班级号 = result[4]
+        if 班级号.isdigit():
+            班级号 = int_to_chinese_op(int(班级号)) or ""
+        elif 班级号:
+            # 位值写法（十二）和阿拉伯数字一样逐位写成中文
+            value = chinese_to_int_op(班级号)
+            if value is not None:
+                班级号 = int_to_chinese_op(value) or ""
         return (result[0], str(学年), str(年制), result[3], str(班级号), result[5])
 
-    def _iter_stu_data_match_result_from_input(self) -> Iterable[tuple[str, ...]]:
+    def _iter_stu_data_match_result_from_input(self) -> Iterable[StudentRecord]:
         """#接龙
 视频组
 
@@ -354,32 +445,70 @@ class 我的输入器(ABC_输入器):
 18. 25软件李欣晨
 """
         print("请输入学生数据（每行一个学生，格式如：1. 23计应2xxx，输入空行结束）：")
-        stu_data:list[tuple[str, str]] = []
-        line:str = input().strip()
-        while not line.startswith("1."):
-            line = input().strip()
-        while line:
-            match_result = self._match_line(line)
-            if not match_result:
-                print_warning(f"未匹配的学生数据: {line}")
-                line = input().strip()
-                continue
-            yield match_result
-            line = input().strip()
-
+        # 等用户输入的时间不算解析耗时
+        lines = profiler.untimed_iter(jielong_reader.iter_input_lines())
+        yield from profiler.timed_iter("parse", self._iter_stu_data_match_result_from_lines(lines))
 
-    def _get_stu_data_from_input(self) -> list[tuple[str, str]]:
-        stu_data:list[tuple[str, str]] = []
-        for match_result in self._iter_stu_data_match_result_from_input():
-            子分组, 学年, 年制, 专业名, 班级号, 姓名 = match_result
-            专业名= self.config_reader.config["class_mappings"].get(专业名, 专业名)
-            年制 = f"{年制}年制" if 年制 else ""
-            # 班级号 = f"{班级号}" if 班级号 else ""
-            班级名 = f'{专业名}{年制}{班级号}'
-            完整班级名 = f"{学年}{班级名}"
-            stu_data.append((完整班级名, 姓名))
+    def _iter_stu_data_match_result_from_lines(self, lines: Iterable[str],
+                                               on_unmatched: Optional[Callable[[str], None]] = None
+                                               ) -> Iterable[StudentRecord]:
+        """从任意行序列中解析接龙：跳过 "1." 之前的表头，遇到空行（或行耗尽）结束
 
-        return stu_data
+        未匹配的行默认逐行提示；给了 on_unmatched 时改为交给它处理（如只计数）
+        """
+        match_line = self._match_line
+        major_resolver = self._get_major_resolver()
+        for line in jielong_reader.iter_接龙_lines(lines):
+            match_result = match_line(line)
+            if not match_result:
+                if on_unmatched is None:
+                    print_warning(f"未匹配的学生数据: {line}")
+                else:
+                    on_unmatched(line)
+                profiler.count("parse_miss")
+                continue
+            yield self._to_student_record(match_result, major_resolver)
+
+    def _iter_stu_data_match_result_from_source(self, source: jielong_reader.接龙来源,
+                                                on_unmatched: Optional[Callable[[str], None]] = None
+                                                ) -> Iterable[StudentRecord]:
+        """从文件路径、二进制流或行序列中流式解析接龙"""
+        return profiler.timed_iter("parse", self._iter_stu_data_match_result_from_lines(
+            jielong_reader.iter_text_lines(source), on_unmatched))
+
+    def _get_major_resolver(self) -> MajorResolver:
+        return get_resolver(self.config_reader.get("class_mappings", {}))
+
+    def _to_student_record(self, match_result: tuple[str, ...],
+                           major_resolver: Optional[MajorResolver] = None) -> StudentRecord:
+        """把一行的匹配结果整理成学生记录，专业名统一成简称"""
+        子分组, 学年, 年制, 专业名, 班级号, 姓名 = match_result
+        if major_resolver is None:
+            major_resolver = self._get_major_resolver()
+        found = major_resolver.find(专业名)
+        if found is None:
+            专业名 = self._correct_major(专业名, 姓名, major_resolver)
+        else:
+            start, end, canonical = found
+            专业名 = f"{专业名[:start]}{canonical}{专业名[end:]}"
+        return StudentRecord(子分组, 学年, 年制, 专业名, 班级号, 姓名)
+
+    def _correct_major(self, 专业名: str, 姓名: str, major_resolver: MajorResolver) -> str:
+        """专业名不在 class_mappings 里时按编辑距离找最接近的，默认只提示；
+        开启 auto_apply 时，候选唯一且改动不到一半的才自动改正（电商 不会被改成 电竞）"""
+        correction = major_resolver.correct(专业名, self.config_reader.get("fuzzy_major_settings.max_distance", 1))
+        if correction is None:
+            return 专业名
+        suggestions = "、".join(name for name, _ in correction.candidates)
+        if not correction.is_confident or not self.config_reader.get("fuzzy_major_settings.auto_apply", False):
+            print_warning(f"未识别的专业名: {专业名}（{姓名}），是否是 {suggestions}？")
+            return 专业名
+        print_warning(f"专业名 {专业名} 按 {suggestions} 处理（{姓名}）")
+        profiler.count("major_corrected")
+        return correction.corrected
+
+    def _get_stu_data_from_input(self) -> list[StudentRecord]:
+        return list(self._iter_stu_data_match_result_from_input())
 
     def _get_test_input_head_string(self) -> str:
         return """202htehte2
@@ -414,9 +543,11 @@ class 我的输入器(ABC_输入器):
 
 """
 
-    def _get_stu_data_from_input_and_save_to_docx(self, *args,**kwargs) -> None:
-        stu_data: list[tuple[str, str]] = self._get_stu_data_from_input()
-        self.for_mat_docx_and_pushout(stu_data, *args,**kwargs)
+    def _get_stu_data_from_input_and_save_to_docx(self, dates: list[tuple[int, int, int]], cause: str = "",
+                                                  leave_type: str = "evening") -> None:
+        """名单只解析一次，生成每个日期的假单"""
+        stu_data: list[StudentRecord] = self._get_stu_data_from_input()
+        self.for_mat_docx_and_pushout_dates(stu_data, dates, cause=cause, leave_type=leave_type)
 
     def _main(self) -> int:
             print("输入器开始")
@@ -425,12 +556,13 @@ class 我的输入器(ABC_输入器):
     或 td - 1
     或  today + 1
     或week+1 0""")
-            year: int = 0; month: int = 0; day: int = 0
+            print("""多个日期: td..td+6  或 week+1 1..5  或 2020-7-1, 2020-7-3""")
+            dates: list[tuple[int, int, int]] = []
             while True:
                 try:
                     input_time_string = input()
                     # 若干空格 =
-                    year, month, day = self._get_ymd_time_by_str_save(input_time_string)
+                    dates = self._get_ymd_times_by_str_save(input_time_string)
                 except ValueError as e:
                     print(f"日期解析错误: {e} 请重新输入")
                     continue
@@ -438,39 +570,165 @@ class 我的输入器(ABC_输入器):
                     print(f"日期解析时遇到未知错误: {e} 请重新输入")
                     continue
                 else:
-                    print(f"解析到的日期: {year}-{month}-{day}")
+                    print(f"解析到的日期: {'、'.join(f'{year}-{month}-{day}' for year, month, day in dates)}")
+                    break
 
 
             cause : str = self.config_reader.get("cause", "？？部")
-            self._get_stu_data_from_input_and_save_to_docx(year=year, month=month, day=day, cause=cause)
+            self._get_stu_data_from_input_and_save_to_docx(dates, cause=cause)
             return 0
 
 class 分组多输出输入器(我的输入器):
-    def _get_stu_data_from_input_and_save_to_docx(self, *args,cause = "", **kwargs) -> None:
-        stu_data_grouped_by_子分组_dict: defaultdict[str, list[tuple[str, str]]] = defaultdict(list)
-        for match_result in self._iter_stu_data_match_result_from_input():
-            子分组, 学年, 年制, 专业名, 班级号, 姓名 = match_result
-            专业名= self.config_reader.config["class_mappings"].get(专业名, 专业名)
-            年制 = f"{年制}年制" if 年制 else ""
-            # 班级号 = f"{班级号}" if 班级号 else ""
-            班级名 = f'{专业名}{年制}{班级号}'
-            完整班级名 = f"{学年}{班级名}"
-            one_stu_data: tuple[str, str] = (完整班级名, 姓名)
-            stu_data_grouped_by_子分组_dict[子分组].append(one_stu_data)
-
+    @profiler.timed("group")
+    def _group_stu_data_by_子分组(self, students: Iterable[StudentRecord]
+                                  ) -> dict[str, list[StudentRecord]]:
+        """按子分组归类学生数据，没有子分组的归到 "未分组" """
+        stu_data_grouped_by_子分组_dict: defaultdict[str, list[StudentRecord]] = defaultdict(list)
+        for student in students:
+            stu_data_grouped_by_子分组_dict[student.子分组 or "未分组"].append(student)
+        return stu_data_grouped_by_子分组_dict
+
+    def _get_stu_data_from_input_and_save_to_docx(self, dates: list[tuple[int, int, int]], cause: str = "",
+                                                  leave_type: str = "evening") -> None:
+        # 先读完再分组，计时时解析和分组各算各的
+        stu_data: list[StudentRecord] = list(self._iter_stu_data_match_result_from_input())
+        stu_data_grouped_by_子分组_dict = self._group_stu_data_by_子分组(stu_data)
+        self._save_grouped_stu_data(stu_data_grouped_by_子分组_dict, dates, cause=cause, leave_type=leave_type)
+
+    def _save_grouped_stu_data(self, stu_data_grouped_by_子分组_dict: Mapping[str, list[StudentRecord]],
+                               dates: list[tuple[int, int, int]], cause: str = "",
+                               leave_type: str = "evening") -> list[str]:
+        """逐个子分组生成各日期的假单，输入与上次生成时相同的跳过，返回跳过的项"""
+        manifest: Optional[OutputManifest] = None
+        if self.config_reader.get("output_settings.skip_unchanged", True):
+            manifest = OutputManifest(resolve_save_path(self.config_reader.get("output_settings.save_path", "desktop")))
+
+        if self.config_reader.get("output_settings.combine_groups", False):
+            skipped = self._save_combined_stu_data(stu_data_grouped_by_子分组_dict, dates, cause, leave_type, manifest)
+        else:
+            skipped = self._save_each_group_stu_data(stu_data_grouped_by_子分组_dict, dates, cause, leave_type,
+                                                     manifest)
+
+        if manifest is not None:
+            manifest.save()
+        if skipped:
+            print(f"输入没有变化，跳过生成: {'、'.join(skipped)}")
+        return skipped
+
+    def _save_each_group_stu_data(self, stu_data_grouped_by_子分组_dict: Mapping[str, list[StudentRecord]],
+                                  dates: list[tuple[int, int, int]], cause: str, leave_type: str,
+                                  manifest: Optional[OutputManifest]) -> list[str]:
+        """每个子分组各自一个文件"""
+        skipped: list[str] = []
         for 子分组, stu_data in stu_data_grouped_by_子分组_dict.items():
-            子分组 = 子分组 if 子分组 else "未分组"
             new_cause = f"{cause}{子分组}"
-            self.for_mat_docx_and_pushout(stu_data, *args, cause=new_cause, **kwargs)
+            if manifest is None:
+                self.for_mat_docx_and_pushout_dates(stu_data, dates, cause=new_cause, leave_type=leave_type)
+                continue
+            pending: dict[tuple[int, int, int], tuple[str, str]] = {}
+            for year, month, day in dates:
+                file_name = self.docx_generator.get_file_name(year, month, day, new_cause)
+                digest = leave_form_hash(stu_data, year, month, day, new_cause, leave_type, self.config_reader)
+                if manifest.is_up_to_date(file_name, digest):
+                    skipped.append(子分组 if len(dates) == 1 else f"{子分组}（{month}月{day}日）")
+                else:
+                    pending[(year, month, day)] = (file_name, digest)
+            if not pending:
+                continue
+            results = self.for_mat_docx_and_pushout_dates(stu_data, list(pending), cause=new_cause,
+                                                          leave_type=leave_type)
+            for (file_name, digest), result in zip(pending.values(), results):
+                if result is not None:
+                    manifest.record(file_name, digest)
+        return skipped
+
+    def _save_combined_stu_data(self, stu_data_grouped_by_子分组_dict: Mapping[str, list[StudentRecord]],
+                                dates: list[tuple[int, int, int]], cause: str, leave_type: str,
+                                manifest: Optional[OutputManifest]) -> list[str]:
+        """所有子分组合并成一个文件，每个日期一份"""
+        cover_summary: bool = self.config_reader.get("output_settings.cover_summary", True)
+        skipped: list[str] = []
+        for year, month, day in dates:
+            file_name = self.docx_generator.get_file_name(year, month, day, cause)
+            digest = ""
+            if manifest is not None:
+                digest = combine_hashes(f"cover_summary={cover_summary}", *(
+                    leave_form_hash(stu_data, year, month, day, f"{cause}{子分组}", leave_type, self.config_reader)
+                    for 子分组, stu_data in stu_data_grouped_by_子分组_dict.items()))
+                if manifest.is_up_to_date(file_name, digest):
+                    skipped.append("合并文档" if len(dates) == 1 else f"合并文档（{month}月{day}日）")
+                    continue
+            try:
+                self.docx_generator.create_combined_leave_form(stu_data_grouped_by_子分组_dict, year, month, day,
+                                                               cause, leave_type, cover_summary=cover_summary)
+            except Exception as e:
+                print(f"生成请假单时发生错误: {e}")
+                continue
+            if manifest is not None:
+                manifest.record(file_name, digest)
+        return skipped
+
+
+class 会话输入器(分组多输出输入器):
+    """记住上次粘贴的接龙，再次粘贴时只解析新增和改动的行"""
+
+    def _iter_stu_data_match_result_from_input(self) -> Iterable[StudentRecord]:
+        print("请输入学生数据（可直接粘贴完整接龙，只解析新增和改动的行，输入空行结束）：")
+        lines = profiler.untimed_iter(jielong_reader.iter_input_lines())
+        yield from profiler.timed_iter("parse", self._iter_stu_data_from_session(lines))
+
+    def _iter_stu_data_from_session(self, lines: Iterable[str]) -> Iterable[StudentRecord]:
+        """用本次粘贴更新会话，报告变化，产出合并后的完整名单"""
+        session = JielongSession(self.config_reader.get("session_settings.path", "接龙会话.json"),
+                                 key=self._session_key())
+        has_previous = bool(session.lines)
+        major_resolver = self._get_major_resolver()
+
+        def match_line(line: str) -> Optional[tuple[str, ...]]:
+            # 会话里存专业名统一、纠错之后的结果，旧行直接复用，纠错提示只在新增和改动的行上出现一次
+            match_result = self._match_line(line)
+            return match_result and self._to_student_record(match_result, major_resolver).fields()
+
+        changes = session.update(jielong_reader.iter_接龙_lines(lines), match_line)
+        session.save()
+        self._report_session_changes(changes, has_previous)
+        for match_result in changes.match_results:
+            yield StudentRecord(*match_result)
+
+    def _session_key(self) -> str:
+        """缓存的结果取决于解析正则（分词器与它等价）、class_mappings 和专业名纠错设置，任一变化旧会话作废"""
+        return combine_hashes(self.pattern,
+                              parser_registry.config_content_hash(self.config_reader.get("class_mappings", {})),
+                              parser_registry.config_content_hash(self.config_reader.get("fuzzy_major_settings", {})))
+
+    @staticmethod
+    def _report_session_changes(changes: SessionChanges, has_previous: bool) -> None:
+        if has_previous and not changes.has_changes():
+            print("接龙与上次相同")
+        else:
+            print(changes.summary())
+        # 第一次粘贴时每行都是新增，不逐行列出
+        if has_previous:
+            for line in changes.added:
+                print(f"  + {line}")
+            for old_line, new_line in changes.edited:
+                print(f"  ~ {old_line} -> {new_line}")
+            for line in changes.removed:
+                print(f"  - {line}")
+        for line in changes.unmatched:
+            print_warning(f"未匹配的学生数据: {line}")
+            profiler.count("parse_miss")
+        if changes.still_unmatched:
+            print_warning(f"另有 {changes.still_unmatched} 行仍未匹配（之前已提示）")
 
 
 if __name__ == "__main__":
     # 经典输入().test_main()
 
     # my = 我的输入器()
-    # my.config_reader.config["output_settings"]["file_name_format"] = "{year}年{month}月{day}日_{cause}假单_未定义输入器.docx"
+    # my.config_reader.override({"output_settings": {"file_name_format": "{year}年{month}月{day}日_{cause}假单_未定义输入器.docx"}})
 
     my = 分组多输出输入器()
-    my.config_reader.config["output_settings"]["file_name_format"] = "{year}年{month}月{day}日_{cause}假单_分组多输出输入器.docx"
+    my.config_reader.override({"output_settings": {"file_name_format": "{year}年{month}月{day}日_{cause}假单_分组多输出输入器.docx"}})
 
     my.test_main()
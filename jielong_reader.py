@@ -0,0 +1,66 @@
+"""接龙文本的流式读取
+
+输入可以是任意字符串行序列、文件路径或二进制流（文件、管道、socket 等），
+按块缓冲解码、逐行产出，几 MB 的导出文件也只占常量内存，不需要替换 sys.stdin。
+"""
+import io
+import os
+from typing import BinaryIO, Iterable, Iterator, Union
+
+from chinese_to_int import normalize_digits
+
+接龙来源 = Union[str, os.PathLike, BinaryIO, Iterable[str]]
+
+DEFAULT_ENCODING = "utf-8-sig"
+
+
+def iter_text_lines(source: 接龙来源, encoding: str = DEFAULT_ENCODING) -> Iterator[str]:
+    """把各种来源统一成逐行产出的字符串
+
+    - str / PathLike：当作文件路径打开
+    - 二进制流：包一层 TextIOWrapper 缓冲解码，读完后不关闭调用方的流
+    - 其余按字符串行序列直接迭代（列表、文本文件对象、sys.stdin 等）
+    无法解码的字节用替换字符代替，不中断读取。
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding=encoding, errors="replace") as f:
+            yield from f
+        return
+
+    if isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+        wrapper = io.TextIOWrapper(source, encoding=encoding, errors="replace")
+        try:
+            # 不用 yield from：提前结束时它会顺带 close() 掉 wrapper 和调用方的流
+            for line in wrapper:
+                yield line
+        finally:
+            wrapper.detach()
+        return
+
+    for line in source:
+        yield line
+
+
+def iter_input_lines() -> Iterator[str]:
+    """逐行读取标准输入（input()），读到 EOF 时正常结束"""
+    while True:
+        try:
+            yield input()
+        except EOFError:
+            return
+
+
+def iter_接龙_lines(lines: Iterable[str]) -> Iterator[str]:
+    """按接龙规则截取学生数据行：跳过 "1." 之前的表头，遇到空行（或输入结束）为止
+
+    产出的行已去掉首尾空白，全角数字已换成半角（"１." 开头的接龙也能识别序号）。
+    """
+    line_iter = (normalize_digits(line).strip() for line in lines)
+    for line in line_iter:
+        if line.startswith("1."):
+            break
+    else:
+        return
+    while line:
+        yield line
+        line = next(line_iter, "")
@@ -0,0 +1,111 @@
+"""增量接龙会话
+
+接龙是越接越长的：上午贴 1–30 行，下午贴 1–45 行。会话记住上次解析过的行（按序号和原文），
+再次粘贴时只匹配新增或改动过的行，报告新增、修改和删除，之前提示过的未匹配行不再重复警告。
+会话保存为 JSON，程序重启后可以接着用。
+"""
+import json
+import os
+import re
+from typing import Callable, Iterable, Optional
+
+MatchResult = tuple[str, str, str, str, str, str]
+
+# 会话文件格式的版本；解析规则和 class_mappings 的变化由会话键（key）体现，不用手动改这里
+SESSION_VERSION = 2
+number_prefix_pattern = re.compile(r"^(\d+)\.")
+
+
+class SessionChanges:
+    """一次粘贴相对上一次的变化"""
+
+    def __init__(self):
+        self.added: list[str] = []
+        self.edited: list[tuple[str, str]] = []  # (旧行, 新行)
+        self.removed: list[str] = []
+        self.unmatched: list[str] = []  # 本次新匹配失败的行
+        self.still_unmatched: int = 0  # 之前就没匹配上、内容也没变的行数
+        self.match_results: list[MatchResult] = []  # 按本次粘贴的顺序
+
+    def has_changes(self) -> bool:
+        return bool(self.added or self.edited or self.removed)
+
+    def summary(self) -> str:
+        return (f"新增 {len(self.added)} 行，修改 {len(self.edited)} 行，删除 {len(self.removed)} 行，"
+                f"共 {len(self.match_results)} 名学生")
+
+
+class JielongSession:
+    """行键 -> (原文, 匹配结果) 的记录；行键是序号（重复的序号加 #n），没有序号的行用原文
+
+    key 标识产生这些匹配结果的解析规则和配置，与文件里记录的不同时，旧的匹配结果全部作废。
+    """
+
+    def __init__(self, path: Optional[str] = None, key: str = ""):
+        self.path = path
+        self.key = key
+        self.lines: dict[str, tuple[str, Optional[MatchResult]]] = {}
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != SESSION_VERSION or data.get("key") != self.key:
+            return
+        self.lines = {key: (text, tuple(match_result) if match_result is not None else None)
+                      for key, (text, match_result) in data.get("lines", {}).items()}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": SESSION_VERSION, "key": self.key, "lines": self.lines}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"保存接龙会话失败: {e}")
+
+    def clear(self) -> None:
+        self.lines = {}
+
+    @staticmethod
+    def _iter_keyed_lines(lines: Iterable[str]) -> Iterable[tuple[str, str]]:
+        seen: dict[str, int] = {}
+        for line in lines:
+            number = number_prefix_pattern.match(line)
+            key = number.group(1) if number else line
+            count = seen[key] = seen.get(key, 0) + 1
+            yield (key if count == 1 else f"{key}#{count}"), line
+
+    def update(self, lines: Iterable[str],
+               match_line: Callable[[str], Optional[MatchResult]]) -> SessionChanges:
+        """用新粘贴的接龙行（已截取、去空白）更新会话，只对新增和改动的行调用 match_line"""
+        changes = SessionChanges()
+        previous = self.lines
+        current: dict[str, tuple[str, Optional[MatchResult]]] = {}
+        for key, line in self._iter_keyed_lines(lines):
+            old = previous.get(key)
+            if old is not None and old[0] == line:
+                match_result = old[1]
+                if match_result is None:
+                    changes.still_unmatched += 1
+            else:
+                match_result = match_line(line)
+                if old is None:
+                    changes.added.append(line)
+                else:
+                    changes.edited.append((old[0], line))
+                if match_result is None:
+                    changes.unmatched.append(line)
+            current[key] = (line, match_result)
+            if match_result is not None:
+                changes.match_results.append(match_result)
+
+        changes.removed = [text for key, (text, _) in previous.items() if key not in current]
+        self.lines = current
+        return changes
@@ -0,0 +1,190 @@
+"""接龙行的线性时间分词器
+
+我的输入器.pattern 里连着好几段 \\s*、可选组和贪婪的 [^...]+，回溯引擎遇到长的乱行会反复重试：
+"25数媒" 后面跟上千个空格再接一个字母，re.match 要几十秒。这里按同样的文法手写一遍：
+
+    [序号.] [xx组] 学年(两位，或 x十[x]) [x年制] 专业名 [班级号][班|班级] 分隔符 姓名(1–8 个汉字)
+
+班级号可以是阿拉伯数字或 [x]十[x]；专业名不会吃进 "[x]十" 开头的部分，把它留给班级号。
+
+先从右往左扫一遍，算出"从位置 i 开始，文法的第 k 段往后能否匹配成功"（每段一个布尔数组），
+再从左往右按正则的尝试顺序（贪婪的取最长、可选的先试有、"班|班级" 先试"班"）逐段选择，
+每一步都只选后面确定能成功的那一种，不需要回溯。两遍都是线性的，选出的结果与回溯引擎
+找到的第一个匹配完全一致（test_接龙解析 中有对拍测试）。
+
+tokenize_line 返回与 compiled_pattern.match(text).groups("") 相同的六元组：
+(子分组, 学年, 年制, 专业名, 班级号, 姓名)，匹配失败返回 None。
+"""
+from typing import Optional
+
+import chinese_to_int
+
+RawMatch = tuple[str, str, str, str, str, str]
+
+# 学年、年制可以写成阿拉伯数字（\d，含全角等各种十进制数字）或中文数字
+_chinese_digits = frozenset(chinese_to_int.all_chinese_num)
+_ten_chars = frozenset(chinese_to_int.ten_chars)
+NAME_MAX_LENGTH = 8
+
+
+def _is_cjk(char: str) -> bool:
+    return "一" <= char <= "龥"
+
+
+def _is_num(char: str) -> bool:
+    return char.isdecimal() or char in _chinese_digits
+
+
+def _is_sep(char: str) -> bool:
+    """分隔符 [,-;，-；\\s]：注意 ",-;" 是一个区间，包含 - . / 0-9 : ;"""
+    return "," <= char <= ";" or "，" <= char <= "；" or char.isspace()
+
+
+def _run_end(text: str, start: int, predicate) -> int:
+    """从 start 开始连续满足 predicate 的字符的结束位置"""
+    end, length = start, len(text)
+    while end < length and predicate(text[end]):
+        end += 1
+    return end
+
+
+def _last_feasible(start: int, end: int, feasible: list[bool]) -> int:
+    """贪婪量词：在 [start, end] 中取最靠后的、后续能匹配成功的位置；调用方保证存在"""
+    while not feasible[end]:
+        end -= 1
+    return end
+
+
+_char_classes: dict[str, tuple[bool, bool, bool, bool, bool, bool]] = {}
+
+
+def _char_class(char: str) -> tuple[bool, bool, bool, bool, bool, bool]:
+    """(分隔符, 空白, \\d, 学年数字, 汉字, 十)，按字符缓存"""
+    char_class = _char_classes.get(char)
+    if char_class is None:
+        char_class = _char_classes[char] = (_is_sep(char), char.isspace(), char.isdecimal(), _is_num(char),
+                                            _is_cjk(char), char in _ten_chars)
+    return char_class
+
+
+def tokenize_line(text: str) -> Optional[RawMatch]:
+    length = len(text)
+    char_classes = [_char_class(char) for char in text]
+    # num、ten 在行尾后补几位 False，向后看几个字符时不用判断越界
+    num = [char_class[3] for char_class in char_classes] + [False] * 3
+    cjk = [char_class[4] for char_class in char_classes]
+    ten = [char_class[5] for char_class in char_classes] + [False] * 3
+
+    # 第一遍（从右往左）：after_xxx[i] 表示从 i 开始，xxx 这一段及其后面全部能匹配
+    # 各数组多留几位表示行尾，行尾处都匹配不上（姓名至少要一个汉字）；i + 1 处的值用局部变量递推
+    size = length + 4
+    after_sep = [False] * size  # 分隔符 \s* 姓名
+    after_class_space = [False] * size  # \s* 分隔符 ...
+    after_class_suffix = [False] * size  # (班|班级)? \s* 分隔符 ...
+    after_class = [False] * size  # (\d+|x?十x?)?(班|班级)? \s* 分隔符 ...
+    after_major_space = [False] * size  # \s* 班级号 ...
+    major_char = [False] * size  # 可以作为专业名的字符（不是 "[x]十" 的开头）
+    after_major = [False] * size  # 专业名+ \s* 班级号 ...
+    after_year_space2 = [False] * size  # \s* 专业名 ...
+    after_years = [False] * size  # (x?年制)? \s* 专业名 ...
+    after_year_space1 = [False] * size  # \s* (x?年制)? ...
+    after_year1 = [False] * size  # 学年 \s* ...
+    name_space = class_space = class_digits = major_space = major = year_space2 = False
+    for i in range(length - 1, -1, -1):
+        char = text[i]
+        is_sep, is_space, is_digit, is_num, is_cjk, is_ten = char_classes[i]
+        after_sep[i] = is_sep and name_space
+        name_space = is_cjk or (is_space and name_space)
+        班_ok = char == "班" and (class_space or (text[i + 1:i + 2] == "级" and after_class_space[i + 2]))
+        class_space = after_class_space[i] = after_sep[i] or (is_space and class_space)
+        class_suffix = after_class_suffix[i] = class_space or 班_ok
+        class_digits = class_suffix or (is_digit and class_digits)
+        class_positional = ((is_ten and (after_class_suffix[i + 1] or (num[i + 1] and after_class_suffix[i + 2])))
+                            or (is_num and ten[i + 1]
+                                and (after_class_suffix[i + 2] or (num[i + 2] and after_class_suffix[i + 3]))))
+        class_ = after_class[i] = class_digits or class_positional
+        next_major_space, major_space = major_space, class_ or (is_space and major_space)
+        after_major_space[i] = major_space
+        major_char[i] = not is_sep and char != "班" and not (is_ten or (is_num and ten[i + 1]))
+        major = after_major[i] = major_char[i] and (next_major_space or major)
+        year_space2 = after_year_space2[i] = major or (is_space and year_space2)
+        years = after_years[i] = (year_space2
+                                  or (char == "年" and text[i + 1:i + 2] == "制" and after_year_space2[i + 2])
+                                  or (is_num and text[i + 1:i + 3] == "年制" and after_year_space2[i + 3]))
+        after_year_space1[i] = years or (is_space and after_year_space1[i + 1])
+        # (xx|x十x?)：两位数字，或位值写法（二十五、二十）
+        after_year1[i] = is_num and ((num[i + 1] and after_year_space1[i + 2])
+                                     or (ten[i + 1] and (after_year_space1[i + 2]
+                                                         or (num[i + 2] and after_year_space1[i + 3]))))
+
+    def group_end(start: int) -> Optional[int]:
+        """([\\u4e00-\\u9fa5]+组)? 从 start 开始：有子分组时返回 "组" 之后的位置，没有返回 start，都不行返回 None"""
+        cjk_end = _run_end(text, start, _is_cjk)
+        for 组_index in range(cjk_end - 1, start, -1):
+            if text[组_index] == "组" and after_year1[组_index + 1]:
+                return 组_index + 1
+        return start if after_year1[start] else None
+
+    # 第二遍（从左往右）：按正则的尝试顺序选择
+    # (?:\d+\.\s*)? —— 数字后面必须紧跟 "."，所以 \d+ 只能取整段数字；空白之后必须是汉字或数字
+    start, 子分组_end = 0, None
+    digit_end = _run_end(text, 0, str.isdecimal)
+    if 0 < digit_end < length and text[digit_end] == ".":
+        start = _run_end(text, digit_end + 1, str.isspace)
+        子分组_end = group_end(start)
+    if 子分组_end is None:
+        start = 0
+        子分组_end = group_end(0)
+        if 子分组_end is None:
+            return None
+    子分组 = text[start:子分组_end]
+    position = 子分组_end
+
+    # 先试 x十x，再试 x十 或 xx（两者互斥）
+    year_end = position + 3 if ten[position + 1] and num[position + 2] and after_year_space1[position + 3] \
+        else position + 2
+    学年 = text[position:year_end]
+    position = _last_feasible(year_end, _run_end(text, year_end, str.isspace), after_years)
+
+    年制 = ""
+    if num[position] and text[position + 1:position + 3] == "年制" and after_year_space2[position + 3]:
+        年制 = text[position]
+        position += 3
+    elif text[position:position + 2] == "年制" and after_year_space2[position + 2]:
+        position += 2
+    position = _last_feasible(position, _run_end(text, position, str.isspace), after_major)
+
+    major_start = position
+    major_end = position
+    while major_char[major_end]:
+        major_end += 1
+    position = _last_feasible(position + 1, major_end, after_major_space)
+    专业名 = text[major_start:position]
+    position = _last_feasible(position, _run_end(text, position, str.isspace), after_class)
+
+    # (\d+|x?十x?)?(班|班级)? —— 数字从长到短，再试位值写法（有 x 的先试），最后是没有班级号；
+    # 每种结束位置依次试 "班"、"班级"、都没有
+    class_ends = list(range(_run_end(text, position, str.isdecimal), position, -1))
+    if num[position] and ten[position + 1]:
+        class_ends += [position + 3, position + 2] if num[position + 2] else [position + 2]
+    elif ten[position]:
+        class_ends += [position + 2, position + 1] if num[position + 1] else [position + 1]
+    class_ends.append(position)
+    班级号 = ""
+    for class_end in class_ends:
+        if text[class_end:class_end + 1] == "班" and after_class_space[class_end + 1]:
+            next_position = class_end + 1
+        elif text[class_end:class_end + 2] == "班级" and after_class_space[class_end + 2]:
+            next_position = class_end + 2
+        elif after_class_space[class_end]:
+            next_position = class_end
+        else:
+            continue
+        班级号 = text[position:class_end]
+        position = next_position
+        break
+    position = _last_feasible(position, _run_end(text, position, str.isspace), after_sep)
+
+    position = _last_feasible(position + 1, _run_end(text, position + 1, str.isspace), cjk + [False])
+    name_end = min(_run_end(text, position, _is_cjk), position + NAME_MAX_LENGTH)
+    return 子分组, 学年, 年制, 专业名, 班级号, text[position:name_end]
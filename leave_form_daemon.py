@@ -0,0 +1,281 @@
+"""常驻后台进程 + Unix 套接字客户端
+
+每生成一次假单都要重新启动 Python、加载 lxml 和 python-docx、读配置。后台进程只启动一次，
+一直持有 ConfigReader、DocumentGenerator 和编译好的解析器；客户端只把日期和接龙文本发过去，
+拿回输出路径（或者文档内容），每次请求只剩解析和构建本身的开销。
+客户端这一侧只用到标准库的 socket 和 json，不导入任何生成相关的模块。
+
+用法示例：
+    python leave_form_daemon.py serve &
+    python leave_form_daemon.py send -d td+1 接龙.txt              # 按配置写到 save_path，打印路径
+    python leave_form_daemon.py send -d "week+1 1..5" --bytes -o 输出 < 接龙.txt
+    python leave_form_daemon.py stop
+
+协议：每条消息是 8 字节头（JSON 长度、附带数据长度，大端）+ JSON + 附带数据。
+请求 JSON：{"command": "generate" | "ping" | "stop", "date", "text", "cause", "leave_type", "return_bytes"}
+响应 JSON：{"ok", "error", "log", "outputs": [...], "skipped": [...], "files": [{"file_name", "size"}]}，
+返回文档内容时附带数据是各文件按顺序拼接的字节。
+"""
+import argparse
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, TextIO
+
+_frame_header = struct.Struct(">II")
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+
+def default_socket_path() -> str:
+    user_id = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+    return os.path.join(tempfile.gettempdir(), f"leave_form_{user_id}.sock")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("连接提前关闭")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock: socket.socket, message: dict[str, Any], payload: bytes = b"") -> None:
+    data = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_frame_header.pack(len(data), len(payload)) + data + payload)
+
+
+def recv_message(sock: socket.socket) -> tuple[dict[str, Any], bytes]:
+    message_size, payload_size = _frame_header.unpack(_recv_exact(sock, _frame_header.size))
+    if message_size + payload_size > MAX_MESSAGE_BYTES:
+        raise ValueError("消息过大")
+    message = json.loads(_recv_exact(sock, message_size).decode("utf-8"))
+    return message, _recv_exact(sock, payload_size)
+
+
+class LeaveFormDaemon:
+    """在一个进程里常驻的生成器，按顺序处理请求"""
+
+    def __init__(self, config_file_path: str = "config.json", workers: int = 4, request_timeout: float = 30.0):
+        # 只有后台进程需要这些模块，客户端不导入
+        from config_reader import ConfigReader
+        from input_handler import 分组多输出输入器
+
+        self.handler = 分组多输出输入器(config_reader=ConfigReader(config_file_path))
+        self.running = True
+        self.workers = workers
+        # 每个连接上收发的超时：连上却迟迟不发完整请求的客户端不会一直占着工作线程
+        self.request_timeout = request_timeout
+        # 连接在各自的线程里收发，生成本身串行：redirect_stdout 是进程级的，生成器也不是线程安全的
+        self._generate_lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """编译正则、构建专业名自动机和文档骨架"""
+        import io
+        from contextlib import redirect_stdout
+
+        with redirect_stdout(io.StringIO()):
+            self.handler._group_stu_data_by_子分组(
+                self.handler._iter_stu_data_match_result_from_source(self.handler._get_接龙输入().splitlines()))
+        self.handler.docx_generator._new_document()
+
+    def handle(self, request: dict[str, Any]) -> tuple[dict[str, Any], bytes]:
+        command = request.get("command", "generate")
+        if command == "ping":
+            return {"ok": True}, b""
+        if command == "stop":
+            self.running = False
+            return {"ok": True}, b""
+        if command != "generate":
+            return {"ok": False, "error": f"未知命令: {command}"}, b""
+        import io
+
+        # 未匹配警告、跳过提示等原本打印到终端的内容，出错时也一并转交给客户端
+        log = io.StringIO()
+        try:
+            with self._generate_lock:
+                return self.generate(request, log)
+        except ValueError as e:
+            return {"ok": False, "error": str(e), "log": log.getvalue()}, b""
+        except Exception as e:
+            return {"ok": False, "error": f"生成请假单时发生错误: {e}", "log": log.getvalue()}, b""
+
+    def generate(self, request: dict[str, Any], log: Optional[TextIO] = None) -> tuple[dict[str, Any], bytes]:
+        """解析、分组、生成；日期支持列表和范围，同交互模式；打印的内容写进 log 并随响应返回"""
+        import io
+        from contextlib import redirect_stdout
+
+        from output_sinks import BytesIOSink, resolve_save_path
+
+        handler = self.handler
+        config_reader = handler.config_reader
+        docx_generator = handler.docx_generator
+        dates = handler._get_ymd_times_by_str_save(str(request.get("date", "")))
+        cause: str = request.get("cause") or config_reader.get("cause", "？？部")
+        leave_type: str = request.get("leave_type") or "evening"
+
+        if log is None:
+            log = io.StringIO()
+        with redirect_stdout(log):
+            grouped = handler._group_stu_data_by_子分组(
+                handler._iter_stu_data_match_result_from_source(str(request.get("text", "")).splitlines()))
+            if not grouped:
+                raise ValueError("没有解析到学生数据（接龙需要从 \"1.\" 开头的行开始）")
+
+            if request.get("return_bytes"):
+                files: list[tuple[str, bytes]] = []
+                for 子分组, stu_data in grouped.items():
+                    group_cause = f"{cause}{子分组}"
+                    contents = docx_generator.create_leave_forms(stu_data, dates, group_cause, leave_type,
+                                                                 sink=BytesIOSink())
+                    files.extend((docx_generator.get_file_name(year, month, day, group_cause), content)
+                                 for (year, month, day), content in zip(dates, contents))
+                response = {"ok": True, "log": log.getvalue(),
+                            "files": [{"file_name": file_name, "size": len(content)} for file_name, content in files]}
+                return response, b"".join(content for _, content in files)
+
+            skipped = handler._save_grouped_stu_data(grouped, dates, cause=cause, leave_type=leave_type)
+
+        save_path = resolve_save_path(config_reader.get("output_settings.save_path", "desktop"))
+        if config_reader.get("output_settings.combine_groups", False):
+            file_names = [docx_generator.get_file_name(year, month, day, cause) for year, month, day in dates]
+        else:
+            file_names = [docx_generator.get_file_name(year, month, day, f"{cause}{子分组}")
+                          for 子分组 in grouped for year, month, day in dates]
+        outputs = [os.path.join(save_path, file_name) for file_name in file_names]
+        return {"ok": True, "log": log.getvalue(), "skipped": skipped,
+                "outputs": [path for path in outputs if os.path.isfile(path)]}, b""
+
+    def serve(self, socket_path: str) -> None:
+        if os.path.exists(socket_path):
+            # 上一次没有正常退出留下的套接字文件；能连上说明已经有后台进程在跑
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(socket_path)
+            except OSError:
+                os.remove(socket_path)
+            else:
+                raise RuntimeError(f"后台进程已在运行: {socket_path}")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="leave-form-daemon") as executor:
+            server.bind(socket_path)
+            os.chmod(socket_path, 0o600)
+            server.listen()
+            # accept 定时返回，好在 stop 请求（在工作线程里处理）之后退出
+            server.settimeout(0.2)
+            print(f"假单后台进程已启动: {socket_path}")
+            try:
+                while self.running:
+                    try:
+                        connection, _ = server.accept()
+                    except socket.timeout:
+                        continue
+                    connection.settimeout(self.request_timeout)
+                    executor.submit(self._handle_connection, connection)
+            finally:
+                os.remove(socket_path)
+        print("假单后台进程已退出")
+
+    def _handle_connection(self, connection: socket.socket) -> None:
+        with connection:
+            try:
+                request, _ = recv_message(connection)
+                send_message(connection, *self.handle(request))
+            except (OSError, ValueError) as e:
+                # socket.timeout 是 OSError 的子类，ConnectionError 也是。
+                # 这里不在 _generate_lock 里，别的线程可能正把 stdout 重定向到它的请求日志，直接写进程的 stderr
+                print(f"请求处理失败: {e}", file=sys.__stderr__)
+
+
+def request_daemon(request: dict[str, Any], socket_path: Optional[str] = None,
+                   timeout: Optional[float] = 120.0) -> tuple[dict[str, Any], bytes]:
+    """向后台进程发送一个请求，返回 (响应, 附带数据)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        send_message(sock, request)
+        return recv_message(sock)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="假单生成后台进程及其客户端")
+    parser.add_argument("-s", "--socket", default=None, help="套接字路径，默认在临时目录下")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="启动后台进程")
+    serve_parser.add_argument("-c", "--config", default="config.json", help="配置文件路径")
+    send_parser = subparsers.add_parser("send", help="发送接龙，生成假单")
+    send_parser.add_argument("source", nargs="?", default=None, help="接龙文本文件，默认读标准输入")
+    send_parser.add_argument("-d", "--date", required=True, help='日期表达式，如 "td+1"、"week+1 1..5"')
+    send_parser.add_argument("--cause", default=None, help="请假原因前缀，默认取配置里的 cause")
+    send_parser.add_argument("--leave-type", default="evening", choices=["morning", "evening"])
+    send_parser.add_argument("--bytes", action="store_true", help="取回文档内容，而不是由后台进程写到 save_path")
+    send_parser.add_argument("-o", "--output-dir", default=".", help="--bytes 时文档的保存目录")
+    subparsers.add_parser("ping", help="检查后台进程是否在运行")
+    subparsers.add_parser("stop", help="停止后台进程")
+    args = parser.parse_args(argv)
+    socket_path = args.socket or default_socket_path()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("当前系统不支持 Unix 套接字")
+        return 1
+
+    if args.command == "serve":
+        daemon = LeaveFormDaemon(args.config)
+        daemon.warm_up()
+        try:
+            daemon.serve(socket_path)
+        except RuntimeError as e:
+            print(e)
+            return 1
+        except KeyboardInterrupt:
+            print("假单后台进程已退出")
+        return 0
+
+    request: dict[str, Any] = {"command": args.command}
+    if args.command == "send":
+        if args.source is None:
+            text = sys.stdin.read()
+        else:
+            with open(args.source, "r", encoding="utf-8-sig", errors="replace") as f:
+                text = f.read()
+        request.update(command="generate", date=args.date, text=text, cause=args.cause,
+                       leave_type=args.leave_type, return_bytes=args.bytes)
+    try:
+        response, payload = request_daemon(request, socket_path)
+    except OSError as e:
+        print(f"无法连接后台进程（{socket_path}）: {e}")
+        return 1
+
+    if response.get("log"):
+        print(response["log"], end="")
+    if not response.get("ok"):
+        print(response.get("error", "未知错误"))
+        return 1
+    if args.command in ("ping", "stop"):
+        print("ok")
+        return 0
+
+    for path in response.get("outputs", []):
+        print(path)
+    if response.get("files"):
+        os.makedirs(args.output_dir, exist_ok=True)
+    offset = 0
+    for file_info in response.get("files", []):
+        path = os.path.join(args.output_dir, file_info["file_name"])
+        with open(path, "wb") as f:
+            f.write(payload[offset:offset + file_info["size"]])
+        offset += file_info["size"]
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""假单历史记录（本地 SQLite）
+
+每次把假单写到磁盘，都把日期、原因、请假类型和名单写进数据库（只在内存中生成的，例如 HTTP 服务、
+基准测试，不记录）；"张三这学期缺了几次晚自习" 不用再一份份打开 Word。数据库默认放在假单的输出目录里。
+学生行冗余存一份日期、月份和请假类型，按姓名、班级、月份的索引同时覆盖了汇总要用的列，
+按学生、班级查询是毫秒级，全年的按月汇总也只需扫一遍索引。
+同一个学生同一天同一种请假只记一次：分组生成后又合并生成同一天，或者两个分组都列了他，都不会重复计数。
+
+用法示例：
+    python leave_history.py student 张三 --from 2025-02-17 --to 2025-07-06
+    python leave_history.py class 25数媒二
+    python leave_history.py month --leave-type evening
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from output_sinks import resolve_save_path
+from student_record import StudentRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forms (
+    id INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    cause TEXT NOT NULL,
+    leave_type TEXT NOT NULL,
+    student_count INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (date, cause, leave_type)
+);
+CREATE TABLE IF NOT EXISTS form_students (
+    form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    month TEXT NOT NULL,
+    leave_type TEXT NOT NULL,
+    sub_group TEXT NOT NULL,
+    class_name TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS form_students_name ON form_students(name, date);
+CREATE INDEX IF NOT EXISTS form_students_class ON form_students(class_name, name);
+CREATE INDEX IF NOT EXISTS form_students_month ON form_students(month, name, form_id);
+CREATE INDEX IF NOT EXISTS form_students_date ON form_students(date);
+CREATE INDEX IF NOT EXISTS form_students_form ON form_students(form_id);
+"""
+# 第 2 版：学生行按 (日期, 请假类型, 班级, 姓名) 去重，升级时先删掉重复的旧行再建唯一索引
+SCHEMA_VERSION = 2
+UNIQUE_STUDENT_INDEX = """
+DELETE FROM form_students WHERE rowid NOT IN (
+    SELECT MAX(rowid) FROM form_students GROUP BY date, leave_type, class_name, name);
+CREATE UNIQUE INDEX IF NOT EXISTS form_students_unique ON form_students(date, leave_type, class_name, name);
+"""
+HISTORY_FILE_NAME = ".假单历史.db"
+
+
+def history_db_path(config_reader, output_dir: Optional[str] = None) -> str:
+    """history_settings.path 配置了就用它，否则放在输出目录（默认 output_settings.save_path）里"""
+    configured = config_reader.get("history_settings.path", "")
+    if configured:
+        return configured
+    if output_dir is None:
+        output_dir = resolve_save_path(config_reader.get("output_settings.save_path", "desktop"))
+    return os.path.join(output_dir, HISTORY_FILE_NAME)
+
+
+class HistoryStore:
+    """假单历史数据库；每个线程各用一个连接，可以在本地服务、批量模式中共用"""
+
+    def __init__(self, db_path: str = "假单历史.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.db_path, timeout=10)
+            connection.execute("PRAGMA foreign_keys = ON")
+            # 批量模式多个进程同时写入时，WAL 下读写互不阻塞
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            if not self._schema_ready:
+                connection.executescript(SCHEMA)
+                if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                    connection.executescript(f"BEGIN;{UNIQUE_STUDENT_INDEX}PRAGMA user_version = {SCHEMA_VERSION};"
+                                             "COMMIT;")
+                self._schema_ready = True
+        return connection
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def record_form(self, students: Iterable[StudentRecord], year: int, month: int, day: int, cause: str,
+                    leave_type: str, file_name: str) -> None:
+        """记录一份假单；同一天、同一原因、同一请假类型重新生成时覆盖之前的记录
+
+        同一天同一类型里已经记在别的假单上的学生（例如之前按分组生成过）改记到这份上，
+        学生被全部移走的旧假单随之删除，其余假单的人数重新统计。
+        """
+        date = f"{year:04d}-{month:02d}-{day:02d}"
+        rows = [(student.子分组, student.完整班级名, student.姓名) for student in students]
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM forms WHERE date = ? AND cause = ? AND leave_type = ?",
+                               (date, cause, leave_type))
+            form_id = connection.execute(
+                "INSERT INTO forms (file_name, date, cause, leave_type, student_count, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (file_name, date, cause, leave_type, len(rows), datetime.now().isoformat(timespec="seconds")),
+            ).lastrowid
+            connection.executemany(
+                "INSERT OR REPLACE INTO form_students (form_id, date, month, leave_type, sub_group, class_name, name)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(form_id, date, date[:7], leave_type, sub_group, class_name, name)
+                 for sub_group, class_name, name in rows])
+            connection.execute(
+                "UPDATE forms SET student_count = (SELECT COUNT(*) FROM form_students WHERE form_id = forms.id)"
+                " WHERE date = ? AND leave_type = ?", (date, leave_type))
+            connection.execute("DELETE FROM forms WHERE date = ? AND leave_type = ? AND student_count = 0",
+                               (date, leave_type))
+
+    @staticmethod
+    def _filters(date_from: Optional[str], date_to: Optional[str], leave_type: Optional[str]
+                 ) -> tuple[str, list[str]]:
+        clauses, parameters = [], []
+        if date_from:
+            clauses.append("date >= ?")
+            parameters.append(date_from)
+        if date_to:
+            clauses.append("date <= ?")
+            parameters.append(date_to)
+        if leave_type:
+            clauses.append("leave_type = ?")
+            parameters.append(leave_type)
+        return "".join(f" AND {clause}" for clause in clauses), parameters
+
+    def student_totals(self, name: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       leave_type: Optional[str] = None) -> list[tuple[str, str, int, str, str]]:
+        """某个学生的请假次数：[(班级, 请假类型, 次数, 最早日期, 最晚日期)]，同一天同一类型只算一次"""
+        where, parameters = self._filters(date_from, date_to, leave_type)
+        return self._connection().execute(
+            "SELECT class_name, leave_type, COUNT(DISTINCT date), MIN(date), MAX(date) FROM form_students"
+            f" WHERE name = ?{where} GROUP BY class_name, leave_type ORDER BY class_name, leave_type",
+            [name, *parameters]).fetchall()
+
+    def student_dates(self, name: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                      leave_type: Optional[str] = None) -> list[tuple[str, str]]:
+        """某个学生每次请假的 (日期, 请假类型)"""
+        where, parameters = self._filters(date_from, date_to, leave_type)
+        return self._connection().execute(
+            f"SELECT DISTINCT date, leave_type FROM form_students WHERE name = ?{where} ORDER BY date, leave_type",
+            [name, *parameters]).fetchall()
+
+    def class_totals(self, class_name: Optional[str] = None, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None, leave_type: Optional[str] = None
+                     ) -> list[tuple[str, int, int]]:
+        """各班（或指定班级）的 (班级, 请假人次, 涉及人数)"""
+        where, parameters = self._filters(date_from, date_to, leave_type)
+        if class_name:
+            where = f" AND class_name = ?{where}"
+            parameters.insert(0, class_name)
+        return self._connection().execute(
+            "SELECT class_name, COUNT(*), COUNT(DISTINCT name) FROM form_students"
+            f" WHERE 1 = 1{where} GROUP BY class_name ORDER BY COUNT(*) DESC, class_name",
+            parameters).fetchall()
+
+    def iter_student_rows(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                          leave_type: Optional[str] = None) -> Iterator[tuple[str, str, str, str]]:
+        """逐行产出 (日期, 子分组, 班级, 姓名)，按日期排序，游标流式读取，不一次载入内存"""
+        where, parameters = self._filters(date_from, date_to, leave_type)
+        yield from self._connection().execute(
+            f"SELECT date, sub_group, class_name, name FROM form_students WHERE 1 = 1{where} ORDER BY date",
+            parameters)
+
+    def month_totals(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                     leave_type: Optional[str] = None) -> list[tuple[str, int, int, int]]:
+        """每月的 (月份, 假单份数, 请假人次, 涉及人数)"""
+        where, parameters = self._filters(date_from, date_to, leave_type)
+        return self._connection().execute(
+            "SELECT month, COUNT(DISTINCT form_id), COUNT(*), COUNT(DISTINCT name)"
+            f" FROM form_students WHERE 1 = 1{where} GROUP BY month ORDER BY month",
+            parameters).fetchall()
+
+
+def _print_rows(header: tuple[str, ...], rows: list[tuple]) -> None:
+    if not rows:
+        print("没有记录")
+        return
+    print("\t".join(header))
+    for row in rows:
+        print("\t".join(str(value) for value in row))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from config_reader import ConfigReader
+
+    parser = argparse.ArgumentParser(description="查询假单历史")
+    parser.add_argument("-c", "--config", default="config.json", help="配置文件路径")
+    parser.add_argument("--db", default=None, help="数据库路径，默认取 history_settings.path，未配置时在输出目录里")
+    parser.add_argument("--from", dest="date_from", default=None, help="起始日期（含），如 2025-02-17")
+    parser.add_argument("--to", dest="date_to", default=None, help="结束日期（含）")
+    parser.add_argument("--leave-type", default=None, choices=["morning", "evening"])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    student_parser = subparsers.add_parser("student", help="某个学生的请假次数和日期")
+    student_parser.add_argument("name")
+    class_parser = subparsers.add_parser("class", help="各班的请假人次")
+    class_parser.add_argument("class_name", nargs="?", default=None, help="完整班级名，如 25数媒二；不填列出所有班级")
+    subparsers.add_parser("month", help="每月合计")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or history_db_path(ConfigReader(args.config))
+    if not os.path.isfile(db_path):
+        print(f"还没有假单历史: {db_path}")
+        return 1
+    store = HistoryStore(db_path)
+    filters = {"date_from": args.date_from, "date_to": args.date_to, "leave_type": args.leave_type}
+    if args.command == "student":
+        _print_rows(("班级", "请假类型", "次数", "最早", "最晚"), store.student_totals(args.name, **filters))
+        dates = store.student_dates(args.name, **filters)
+        if dates:
+            print("日期: " + "、".join(f"{date}（{leave_type}）" for date, leave_type in dates))
+    elif args.command == "class":
+        _print_rows(("班级", "人次", "人数"), store.class_totals(args.class_name, **filters))
+    else:
+        _print_rows(("月份", "假单份数", "人次", "人数"), store.month_totals(**filters))
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,36 @@
+import argparse
+
 import input_handler
 import config_reader
+from profiling import profiler
 
 
 config_reader = config_reader.ConfigReader("config.json")
 
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="部门假单生成器")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="SUMMARY_PATH",
+                        help="记录各阶段耗时，退出时写出 JSON 汇总（可选指定路径，支持 {timestamp}）")
+    parser.add_argument("--cprofile", default=None, metavar="PATH", help="同时输出 cProfile 数据")
+    return parser.parse_args(argv)
+
+def setup_profiler(args: argparse.Namespace) -> None:
+    profile_settings = config_reader.get("profile_settings", {})
+    if args.profile is None and not profile_settings.get("enabled", False):
+        return
+    summary_path = args.profile or profile_settings.get("summary_path") or "profile_{timestamp}.json"
+    cprofile_path = args.cprofile or profile_settings.get("cprofile_path") or None
+    profiler.enable(summary_path, cprofile_path)
+
 def main():
+    setup_profiler(parse_args())
     input_handler_maker_name:str = config_reader.get("input_handler_name",
                                                      "分组多输出输入器")
-    input_handler_maker: type[input_handler.ABC_输入器] = getattr(input_handler_maker_name,
+    input_handler_maker: type[input_handler.ABC_输入器] = getattr(input_handler,
         input_handler_maker_name, input_handler.分组多输出输入器)
     a_input_handler = input_handler_maker(config_reader=config_reader)
     a_input_handler.main()
     # input("程序结束")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,194 @@
+"""专业名解析：由 class_mappings 构建 Aho-Corasick 自动机，一遍扫描找出最长的专业名
+
+打错字的专业名（计用、数煤）精确匹配不到时，在 BK 树里按编辑距离找最接近的专业名。
+"""
+from collections import deque
+from typing import Mapping, Optional
+
+import parser_registry
+from chinese_to_int import all_chinese_num
+
+# 专业名后面常跟的修饰：单（单招）、中文班级号，模糊匹配时先去掉
+_trailing_modifier_chars = frozenset("单" + all_chinese_num)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein 编辑距离"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """BK 树：按编辑距离组织的词表，查询时靠三角不等式剪枝，不用和每个词比较"""
+
+    def __init__(self, words):
+        self._root: Optional[tuple[str, dict[int, tuple]]] = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> list[tuple[int, str]]:
+        """编辑距离不超过 max_distance 的词，按 (距离, 词) 排序"""
+        results: list[tuple[int, str]] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = edit_distance(word, node_word)
+            if distance <= max_distance:
+                results.append((distance, node_word))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(results)
+
+
+class MajorCorrection:
+    """一次模糊匹配的结果"""
+
+    def __init__(self, original: str, distance: int, candidates: list[tuple[str, str]], modifiers: str):
+        self.original = original
+        self.distance = distance
+        self.candidates = candidates  # 距离最近的 (写法, 简称)
+        self.modifiers = modifiers
+
+    @property
+    def is_ambiguous(self) -> bool:
+        """最近的几个候选对应不同的专业"""
+        return len({canonical for _, canonical in self.candidates}) > 1
+
+    @property
+    def is_confident(self) -> bool:
+        """可以自动改正：最近的候选只对应一个专业，且改动不到专业名的一半（两个字的专业名只提示）"""
+        return not self.is_ambiguous and self.distance * 2 < len(self.original) - len(self.modifiers)
+
+    @property
+    def corrected(self) -> str:
+        """按第一个候选改正后的专业名（简称 + 原来的修饰）"""
+        return self.candidates[0][1] + self.modifiers
+
+
+class MajorResolver:
+    """专业名解析器
+
+    class_mappings 的键（全称）和值（简称）都作为模式串，命中后统一返回简称。
+    扫描时取最靠左的命中，同一起点取最长的，结果与 class_mappings 的键顺序无关。
+    """
+
+    def __init__(self, class_mappings: Mapping[str, str]):
+        # 简称本身也是合法写法；同一个词既是简称又是全称时以映射为准
+        canonical_by_name: dict[str, str] = {short: short for short in class_mappings.values()}
+        canonical_by_name.update(class_mappings)
+        self._canonical_by_name = canonical_by_name
+        self._bk_tree = BKTree(name for name in canonical_by_name if name)
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # 以该状态结尾的最长模式串长度及其简称（沿失败链继承）
+        self._out_len: list[int] = [0]
+        self._out_canonical: list[str] = [""]
+        self._max_len = max((len(name) for name in canonical_by_name), default=0)
+
+        for name, canonical in canonical_by_name.items():
+            if not name:
+                continue
+            state = 0
+            for char in name:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out_len.append(0)
+                    self._out_canonical.append("")
+                state = next_state
+            self._out_len[state] = len(name)
+            self._out_canonical[state] = canonical
+        self._build_fail_links()
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail_target if fail_target != next_state else 0
+                if not self._out_len[next_state]:
+                    self._out_len[next_state] = self._out_len[self._fail[next_state]]
+                    self._out_canonical[next_state] = self._out_canonical[self._fail[next_state]]
+
+    def find(self, text: str) -> Optional[tuple[int, int, str]]:
+        """返回最靠左、最长的专业名命中 (起点, 终点, 简称)，没有命中返回 None"""
+        goto, fail, out_len = self._goto, self._fail, self._out_len
+        best_start = best_end = -1
+        state = 0
+        for index, char in enumerate(text):
+            # 之后的命中起点都不可能比已有结果更靠左
+            if best_start >= 0 and index - self._max_len >= best_start:
+                break
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            length = out_len[state]
+            if length:
+                start = index + 1 - length
+                if best_start < 0 or start < best_start or (start == best_start and index + 1 > best_end):
+                    best_start, best_end, best_state = start, index + 1, state
+        if best_start < 0:
+            return None
+        return best_start, best_end, self._out_canonical[best_state]
+
+    def resolve(self, text: str) -> Optional[str]:
+        """返回文本中专业名的简称，没有命中返回 None"""
+        found = self.find(text)
+        return found[2] if found else None
+
+    def correct(self, text: str, max_distance: int = 1) -> Optional[MajorCorrection]:
+        """去掉尾部修饰后找编辑距离最近的专业名；距离要小于专业名本身的长度，避免两个字全错也算数"""
+        core = text.rstrip("".join(_trailing_modifier_chars)) if max_distance > 0 else ""
+        if not core:
+            return None
+        matches = self._bk_tree.search(core, min(max_distance, len(core) - 1))
+        if not matches:
+            return None
+        best_distance = matches[0][0]
+        candidates = [(name, self._canonical_by_name[name]) for distance, name in matches if distance == best_distance]
+        return MajorCorrection(text, best_distance, candidates, text[len(core):])
+
+
+_resolvers: dict[str, MajorResolver] = {}
+
+
+def get_resolver(class_mappings: Mapping[str, str]) -> MajorResolver:
+    """按 class_mappings 内容哈希缓存解析器，改了配置会自动重建"""
+    content_hash = parser_registry.config_content_hash(class_mappings)
+    resolver = _resolvers.get(content_hash)
+    if resolver is None:
+        _resolvers.clear()
+        resolver = _resolvers[content_hash] = MajorResolver(class_mappings)
+    return resolver
@@ -6,6 +6,9 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
+from config_reader import ConfigReader
+from major_resolver import get_resolver
+
 
 学院名: str
 标题格式化文本: str = "%s"
@@ -20,6 +23,7 @@ def parse_student_data(input_str):
     """使用正则表达式解析学生数据"""
     pattern = r'(?:^\d+\.\s*)?(\d{2})(云计算|计算机应用技术|计应|大数据技术|大数据|网络技术|网络|软件技术|软件|人工智能技术应用|人工智能|数字媒体技术班|数字媒体技术|数字媒体|数媒|电竞)(五年制)?(单)?(?:(\d+)(?:班|班级)?)?\s*?(\S+)'
     matches = re.findall(pattern, input_str)
+    major_resolver = get_resolver(ConfigReader.get_default_config_view()["class_mappings"])
     students = []
     for match in matches:
         grade = match[0]  # 年级
@@ -29,22 +33,7 @@ def parse_student_data(input_str):
         class_num = match[4] if match[4] else ''  # 阿拉伯数字班级号
         name = match[5].strip()  # 姓名
         modifiers = is_five_year + is_single_class
-        class_mapping = {
-            '网络技术': '网络',
-            '计算机应用': '计应',
-            '软件技术': '软件',
-            '云计算': '云计算',
-            '电子竞技': '电竞',
-            '人工智能': '人工智能',
-            '人工智能技术应用': '人工智能',
-            '大数据技术': '大数据',
-            '数字媒体': '数媒',
-        }
-        full_base_class = base_class
-        for short, full in class_mapping.items():
-            if short in base_class:
-                full_base_class = full
-                break
+        full_base_class = major_resolver.resolve(base_class) or base_class
         class_name = full_base_class + modifiers + class_num
         full_class = f"{grade}{class_name}"
         students.append((full_class, name))
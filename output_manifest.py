@@ -0,0 +1,76 @@
+"""输出目录中的生成清单：输入没变的假单不再重新生成
+
+接龙一天要跑好几次，通常只有一两个子分组有新人加入。清单记录每个输出文件对应的输入哈希
+（排好序的名单、日期、原因、请假类型和影响文档内容的配置），哈希相同且文件还在时就跳过。
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Iterable
+
+from student_record import StudentRecord
+
+MANIFEST_FILE_NAME = ".假单清单.json"
+# 文档构建方式变化时递增，让旧清单整体失效
+MANIFEST_VERSION = 1
+# 影响文档内容的配置项（class_mappings 已经体现在名单的班级名里）
+RELEVANT_CONFIG_KEYS = ("college_name", "title_format", "font_settings", "table_settings", "leave_types")
+
+
+def leave_form_hash(students: Iterable[StudentRecord], year: int, month: int, day: int, cause: str,
+                    leave_type: str, config_reader: Any) -> str:
+    """一份假单全部输入的 SHA-256"""
+    payload = {
+        "version": MANIFEST_VERSION,
+        "roster": sorted((student.完整班级名, student.姓名) for student in students),
+        "date": [year, month, day],
+        "cause": cause,
+        "leave_type": leave_type,
+        "config": {key: config_reader.get(key) for key in RELEVANT_CONFIG_KEYS},
+    }
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def combine_hashes(*parts: str) -> str:
+    """多份输入合成一个文件时（如合并文档），把各部分的哈希再合成一个"""
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class OutputManifest:
+    """输出目录中的 文件名 -> 输入哈希 记录"""
+
+    def __init__(self, save_path: str):
+        self.save_path = save_path
+        self.manifest_path = os.path.join(save_path, MANIFEST_FILE_NAME)
+        self.entries: dict[str, dict[str, str]] = self._load()
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def is_up_to_date(self, file_name: str, digest: str) -> bool:
+        """清单中的哈希一致，并且文件还在（没被手动删掉）"""
+        entry = self.entries.get(file_name)
+        return (entry is not None and entry.get("hash") == digest
+                and os.path.isfile(os.path.join(self.save_path, file_name)))
+
+    def record(self, file_name: str, digest: str) -> None:
+        self.entries[file_name] = {"hash": digest, "generated_at": datetime.now().isoformat(timespec="seconds")}
+
+    def save(self) -> None:
+        """先写临时文件再替换，中途中断也不会留下半个清单"""
+        temp_path = f"{self.manifest_path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": self.entries}, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            print(f"写入生成清单失败: {e}")
@@ -0,0 +1,96 @@
+"""假单的输出目标
+
+DocumentGenerator 构建好文档后交给 sink 写出，create_leave_form 返回 sink.write 的结果：
+- FileSystemSink：写到目录里（原来的行为，"desktop" 表示桌面），返回文件路径
+- BytesIOSink：只在内存中序列化，返回 bytes，方便再打包、上传或计算哈希
+- ZipSink：多份假单依次直接写进同一个 zip，不经过中间的 bytes，返回在压缩包中的文件名
+- NullSink：什么都不写，基准测试只想测构建时用
+"""
+import io
+import os
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Optional, Union
+
+
+def resolve_save_path(save_path: str) -> str:
+    """"desktop" 展开为当前用户的桌面目录"""
+    if save_path == "desktop":
+        return os.path.join(os.path.expanduser("~"), "Desktop")
+    return save_path
+
+
+class OutputSink(ABC):
+    """输出目标的基类"""
+
+    # 文档真正落盘时所在的目录；只在内存中的输出为 None，这样生成的假单不记进假单历史
+    output_dir: Optional[str] = None
+
+    @abstractmethod
+    def write(self, doc: Any, file_name: str) -> Any:
+        """写出一份文档，返回值作为 create_leave_form 的返回值"""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class FileSystemSink(OutputSink):
+    def __init__(self, save_path: str = "desktop"):
+        self.save_path = self.output_dir = resolve_save_path(save_path)
+
+    def write(self, doc: Any, file_name: str) -> str:
+        file_path = os.path.join(self.save_path, file_name)
+        doc.save(file_path)
+        return file_path
+
+
+class BytesIOSink(OutputSink):
+    def write(self, doc: Any, file_name: str) -> bytes:
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
+
+
+class ZipSink(OutputSink):
+    """把多份假单写进一个 zip
+
+    target 为文件路径或可写的二进制流；不传时写到内部的 BytesIO，close() 之后用 getvalue() 取出。
+    docx 本身已经是压缩过的，默认不再压缩一遍。
+    """
+
+    def __init__(self, target: Union[str, os.PathLike, BinaryIO, None] = None, compression: Optional[int] = None):
+        # 用到时才导入，交互模式启动时不需要 zipfile
+        import zipfile
+
+        if compression is None:
+            compression = zipfile.ZIP_STORED
+        self._buffer: Optional[io.BytesIO] = io.BytesIO() if target is None else None
+        self.archive = zipfile.ZipFile(self._buffer if target is None else target, "w", compression)
+        if isinstance(target, (str, os.PathLike)):
+            self.output_dir = os.path.dirname(os.path.abspath(target))
+        self.file_names: list[str] = []
+
+    def write(self, doc: Any, file_name: str) -> str:
+        with self.archive.open(file_name, "w") as entry:
+            doc.save(entry)
+        self.file_names.append(file_name)
+        return file_name
+
+    def close(self) -> None:
+        self.archive.close()
+
+    def getvalue(self) -> bytes:
+        """内部缓冲区中的 zip 内容（需要先 close）"""
+        if self._buffer is None:
+            raise ValueError("ZipSink 写到了外部目标，没有内部缓冲区")
+        return self._buffer.getvalue()
+
+
+class NullSink(OutputSink):
+    def write(self, doc: Any, file_name: str) -> str:
+        return file_name
@@ -0,0 +1,66 @@
+"""接龙解析用的正则注册表
+
+每个输入器的正则只编译一次：
+- 与配置无关的正则用 compile_pattern 编译并缓存
+- 依赖 class_mappings 的正则（例如专业名分支）通过 register 注册构造函数，
+  get_pattern 按 class_mappings 内容哈希缓存编译结果，改了配置会自动重建
+"""
+import hashlib
+import json
+import re
+from typing import Callable, Mapping
+
+PatternBuilder = Callable[[Mapping[str, str]], str]
+
+_builders: dict[str, PatternBuilder] = {}
+_compiled_by_name: dict[str, tuple[str, re.Pattern]] = {}
+_compiled_static: dict[str, re.Pattern] = {}
+
+
+def config_content_hash(class_mappings: Mapping[str, str]) -> str:
+    """class_mappings 的内容哈希，与键的顺序无关"""
+    content = json.dumps(class_mappings, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def major_alternation(class_mappings: Mapping[str, str]) -> str:
+    """由 class_mappings 的键和值拼出专业名的正则分支，长的在前，保证取到最长的专业名"""
+    names = set(class_mappings) | set(class_mappings.values())
+    return "|".join(re.escape(name) for name in sorted(names, key=lambda name: (-len(name), name)))
+
+
+def compile_pattern(pattern: str) -> re.Pattern:
+    """编译与配置无关的正则，同一个正则只编译一次"""
+    compiled = _compiled_static.get(pattern)
+    if compiled is None:
+        compiled = _compiled_static[pattern] = re.compile(pattern)
+    return compiled
+
+
+def register(name: str) -> Callable[[PatternBuilder], PatternBuilder]:
+    """注册一个依赖 class_mappings 的正则构造函数
+
+    用法：
+        @parser_registry.register("经典输入")
+        def _build(class_mappings) -> str: ...
+    """
+    def decorator(builder: PatternBuilder) -> PatternBuilder:
+        _builders[name] = builder
+        _compiled_by_name.pop(name, None)
+        return builder
+    return decorator
+
+
+def get_pattern(name: str, class_mappings: Mapping[str, str]) -> re.Pattern:
+    """取已编译的正则，class_mappings 内容变化时重新编译
+
+    Raises:
+        KeyError: 没有注册过该名称
+    """
+    content_hash = config_content_hash(class_mappings)
+    cached = _compiled_by_name.get(name)
+    if cached is not None and cached[0] == content_hash:
+        return cached[1]
+    compiled = re.compile(_builders[name](class_mappings))
+    _compiled_by_name[name] = (content_hash, compiled)
+    return compiled
@@ -0,0 +1,167 @@
+"""生成流程的分阶段计时
+
+全局只有一个 profiler，默认关闭，关闭时计时器几乎没有开销。
+开启后记录解析、分组、文档构建各步骤和写文件的耗时，以及解析未命中的行数，
+退出时写出 JSON 汇总，可选同时输出 cProfile 数据，方便不同时间的运行互相对比。
+"""
+import atexit
+import cProfile
+import functools
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class StageProfiler:
+    """按阶段名累计耗时和计数"""
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.summary_path: Optional[str] = None
+        self.cprofile_path: Optional[str] = None
+        # 阶段名 -> [调用次数, 总耗时, 最长一次]
+        self.stages: dict[str, list] = {}
+        self.counters: dict[str, int] = {}
+        self._started_at: Optional[datetime] = None
+        self._started: float = 0.0
+        self._cprofile: Optional[cProfile.Profile] = None
+        # untimed_iter 中等待的累计时间，timed_iter 从各自的耗时里扣掉
+        self._excluded: float = 0.0
+
+    def enable(self, summary_path: str, cprofile_path: Optional[str] = None) -> None:
+        """开启计时，程序退出时写出汇总；summary_path 中可用 {timestamp} 占位"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._started_at = datetime.now()
+        self._started = time.perf_counter()
+        timestamp = self._started_at.strftime("%Y%m%d_%H%M%S")
+        self.summary_path = summary_path.format(timestamp=timestamp)
+        self.cprofile_path = cprofile_path.format(timestamp=timestamp) if cprofile_path else None
+        if self.cprofile_path:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        atexit.register(self.write_summary)
+
+    def add(self, name: str, seconds: float) -> None:
+        record = self.stages.get(name)
+        if record is None:
+            self.stages[name] = [1, seconds, seconds]
+        else:
+            record[0] += 1
+            record[1] += seconds
+            if seconds > record[2]:
+                record[2] = seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        """累加计数器（例如解析未命中的行数）"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def stage(self, name: str):
+        """计时一个代码块"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def timed(self, name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """计时一个函数的装饰器"""
+        def decorator(func: Callable[..., T]) -> Callable[..., T]:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def timed_iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """只统计迭代器自身产出每一项的耗时，不包括调用方处理的时间"""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        total = 0.0
+        try:
+            while True:
+                started = perf_counter()
+                excluded = self._excluded
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    total += perf_counter() - started - (self._excluded - excluded)
+                    return
+                total += perf_counter() - started - (self._excluded - excluded)
+                yield item
+        finally:
+            self.add(name, total)
+
+    def untimed_iter(self, iterable: Iterable[T]) -> Iterator[T]:
+        """等待这个迭代器产出的时间（例如用户在 input() 处打字）不计入外层 timed_iter"""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        while True:
+            started = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._excluded += perf_counter() - started
+            yield item
+
+    def summary(self) -> dict:
+        return {
+            "started_at": self._started_at.isoformat(timespec="seconds") if self._started_at else None,
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": {
+                name: {
+                    "count": count,
+                    "total_seconds": round(total, 6),
+                    "mean_ms": round(total / count * 1000, 3),
+                    "max_ms": round(longest * 1000, 3),
+                }
+                for name, (count, total, longest) in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def write_summary(self) -> None:
+        """写出 JSON 汇总（以及 cProfile 数据）"""
+        if not self.enabled:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            try:
+                self._cprofile.dump_stats(self.cprofile_path)
+                print(f"cProfile 数据: {self.cprofile_path}")
+            except OSError as e:
+                print(f"写入 cProfile 数据失败: {e}")
+            self._cprofile = None
+        try:
+            with open(self.summary_path, "w", encoding="utf-8") as f:
+                json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+            print(f"计时汇总: {self.summary_path}")
+        except OSError as e:
+            print(f"写入计时汇总失败: {e}")
+
+
+profiler = StageProfiler()
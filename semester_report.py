@@ -0,0 +1,188 @@
+"""学期汇总报告：很多份接龙（或假单历史）一遍流式统计，按班级、子分组、周出一份汇总
+
+每条学生记录只经过一次计数器，不在内存里攒名单，也不为中间的分组单独构建文档；
+最后只生成一份 CSV 或一份 .docx。
+
+用法示例：
+    python semester_report.py 接龙导出/ -o 三月汇总.csv                   # 日期取文件名中的日期，没有则取修改时间
+    python semester_report.py --history --from 2025-03-01 --to 2025-03-31 -o 三月汇总.docx
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+from collections import Counter
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from input_handler import print_red, print_warning
+
+# 文件名里的日期：2025-3-3、2025_03_03、2025.3.3、2025年3月3日
+file_name_date_pattern = re.compile(r"(\d{4})[-_.年](\d{1,2})[-_.月](\d{1,2})")
+
+
+class SemesterAggregate:
+    """按班级、子分组、周（周一的日期）累计请假人次"""
+
+    def __init__(self):
+        self.by_class: Counter[str] = Counter()
+        self.by_sub_group: Counter[str] = Counter()
+        self.by_week: Counter[date] = Counter()
+        self.students: set[tuple[str, str]] = set()  # (班级, 姓名)
+        self.dates: set[date] = set()
+        self.total = 0
+
+    def add(self, day: date, sub_group: str, class_name: str, name: str) -> None:
+        self.by_class[class_name] += 1
+        self.by_sub_group[sub_group or "未分组"] += 1
+        self.by_week[day - timedelta(days=day.weekday())] += 1
+        self.students.add((class_name, name))
+        self.dates.add(day)
+        self.total += 1
+
+    def add_all(self, rows: Iterable[tuple[date, str, str, str]]) -> None:
+        for row in rows:
+            self.add(*row)
+
+    def sections(self) -> list[tuple[str, str, list[tuple[str, int]]]]:
+        """[(标题, 键的列名, [(键, 人次)])]，班级、子分组按人次从多到少，周按时间"""
+        return [
+            ("各班级", "班级", self.by_class.most_common()),
+            ("各子分组", "子分组", self.by_sub_group.most_common()),
+            ("各周", "周（周一）", [(week.isoformat(), count) for week, count in sorted(self.by_week.items())]),
+        ]
+
+    def period(self) -> str:
+        if not self.dates:
+            return ""
+        return f"{min(self.dates).isoformat()} 至 {max(self.dates).isoformat()}"
+
+
+def date_of_file(path: Path) -> date:
+    """接龙文件对应的日期：文件名中的日期优先，否则取修改时间"""
+    match = file_name_date_pattern.search(path.stem)
+    if match:
+        try:
+            return date(*map(int, match.groups()))
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(path.stat().st_mtime).date()
+
+
+def iter_rows_from_files(handler, files: list[Path]) -> Iterable[tuple[date, str, str, str]]:
+    """逐个文件流式解析，产出 (日期, 子分组, 班级, 姓名)；未匹配的行每个文件汇总提示一次，专业名纠错等提示照常输出"""
+    for file_path in files:
+        day = date_of_file(file_path)
+        unmatched: list[str] = []
+        try:
+            for student in handler._iter_stu_data_match_result_from_source(file_path, unmatched.append):
+                yield day, student.子分组, student.完整班级名, student.姓名
+        except OSError as e:
+            print_red(f"读取 {file_path} 失败: {e}")
+        if unmatched:
+            print_warning(f"{file_path} 中有 {len(unmatched)} 行未匹配，如: {unmatched[0]}")
+
+
+def iter_rows_from_history(store, date_from: Optional[str], date_to: Optional[str],
+                           leave_type: Optional[str]) -> Iterable[tuple[date, str, str, str]]:
+    for day, sub_group, class_name, name in store.iter_student_rows(date_from, date_to, leave_type):
+        yield date.fromisoformat(day), sub_group, class_name, name
+
+
+def write_csv(aggregate: SemesterAggregate, path: str) -> None:
+    """一个 CSV：统计维度, 键, 人次；Excel 打开中文不乱码"""
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["统计维度", "键", "人次"])
+        for title, _, rows in aggregate.sections():
+            writer.writerows((title, key, count) for key, count in rows)
+        writer.writerow(["合计", "请假人次", aggregate.total])
+        writer.writerow(["合计", "涉及人数", len(aggregate.students)])
+        writer.writerow(["合计", "天数", len(aggregate.dates)])
+
+
+def write_docx(aggregate: SemesterAggregate, path: str, title: str, config_reader) -> None:
+    """一份 .docx：标题、时间范围、合计，各维度一张表；样式和表格构建同假单"""
+    from docx_generator import DocumentGenerator
+
+    docx_generator = DocumentGenerator(config_reader)
+    doc = docx_generator._new_blank_document()
+    doc.add_paragraph(title, style="假单标题")
+    doc.add_paragraph(f"统计时间：{aggregate.period()}　共 {len(aggregate.dates)} 天，"
+                      f"请假 {aggregate.total} 人次，涉及 {len(aggregate.students)} 人", style="假单正文")
+
+    builder = docx_generator._get_table_builder(doc, col_count=2)
+    body = doc.element.body
+    for section_title, key_header, rows in aggregate.sections():
+        doc.add_paragraph(style="假单正文").add_run(section_title).bold = True
+        table_rows = [builder.header_row([key_header, "人次"])]
+        table_rows.extend(builder.body_row((key, str(count))) for key, count in rows)
+        body._insert_tbl(builder.build(table_rows))
+    doc.save(path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from batch_main import collect_input_files
+    from config_reader import ConfigReader
+    from input_handler import 分组多输出输入器
+
+    parser = argparse.ArgumentParser(description="把多份接龙或假单历史汇总成一份学期报告")
+    parser.add_argument("sources", nargs="*", help="接龙文本所在目录、通配符或文件路径")
+    parser.add_argument("--history", action="store_true", help="从假单历史统计（数据库位置同 leave_history.py），不能和接龙文件一起用")
+    parser.add_argument("-c", "--config", default="config.json", help="配置文件路径")
+    parser.add_argument("--from", dest="date_from", default=None, help="起始日期（含），如 2025-02-17")
+    parser.add_argument("--to", dest="date_to", default=None, help="结束日期（含）")
+    parser.add_argument("--leave-type", default=None, choices=["morning", "evening"], help="只统计历史中的某种请假")
+    parser.add_argument("--title", default="请假汇总", help="报告标题（.docx）")
+    parser.add_argument("-o", "--output", required=True, help="输出路径，.csv 或 .docx")
+    args = parser.parse_args(argv)
+
+    if not args.sources and not args.history:
+        print_red("请给出接龙文件，或使用 --history")
+        return 1
+    if args.sources and args.history:
+        # 历史就是这些接龙生成假单时记下的，两者一起统计会重复计数
+        print_red("--history 不能和接龙文件一起使用")
+        return 1
+    output_format = os.path.splitext(args.output)[1].lower()
+    if output_format not in (".csv", ".docx"):
+        print_red("输出只支持 .csv 或 .docx")
+        return 1
+
+    try:
+        date_from = date.fromisoformat(args.date_from) if args.date_from else date.min
+        date_to = date.fromisoformat(args.date_to) if args.date_to else date.max
+    except ValueError as e:
+        print_red(f"日期格式应为 2025-03-01: {e}")
+        return 1
+
+    config_reader = ConfigReader(args.config)
+    aggregate = SemesterAggregate()
+    if args.sources:
+        files = collect_input_files(args.sources)
+        handler = 分组多输出输入器(config_reader=config_reader)
+        aggregate.add_all(row for row in iter_rows_from_files(handler, files) if date_from <= row[0] <= date_to)
+    else:
+        from leave_history import HistoryStore, history_db_path
+
+        db_path = history_db_path(config_reader)
+        if not os.path.isfile(db_path):
+            print_red(f"还没有假单历史: {db_path}")
+            return 1
+        store = HistoryStore(db_path)
+        aggregate.add_all(iter_rows_from_history(store, args.date_from and date_from.isoformat(),
+                                                 args.date_to and date_to.isoformat(), args.leave_type))
+        store.close()
+
+    if output_format == ".csv":
+        write_csv(aggregate, args.output)
+    else:
+        write_docx(aggregate, args.output, args.title, config_reader)
+    print(f"{aggregate.period()} 共 {aggregate.total} 人次，{len(aggregate.students)} 人 -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import sys
+from functools import lru_cache
+from typing import Any, Iterator
+
+
+@lru_cache(maxsize=4096)
+def _full_class_name(学年: str, 年制: str, 专业名: str, 班级号: str) -> str:
+    """(学年, 年制, 专业名, 班级号) -> 完整班级名；有上限，常驻进程里不会无限增长"""
+    年制_text = f"{年制}年制" if 年制 else ""
+    return sys.intern(f"{学年}{专业名}{年制_text}{班级号}")
+
+
+class StudentRecord:
+    """一条接龙解析出的学生记录（不可变）
+
+    用 __slots__ 存储，子分组和班级名都经过 sys.intern，完整班级名按 (学年, 年制, 专业名, 班级号)
+    经有上限的 LRU 缓存拼接，几十万行的导出也不会产生大量重复字符串。
+    """
+    __slots__ = ("子分组", "学年", "年制", "专业名", "班级号", "姓名", "完整班级名")
+
+    子分组: str
+    学年: str
+    年制: str
+    专业名: str
+    班级号: str
+    姓名: str
+    完整班级名: str
+
+    def __init__(self, 子分组: str, 学年: str, 年制: str, 专业名: str, 班级号: str, 姓名: str):
+        intern = sys.intern
+        set_attr = object.__setattr__
+        set_attr(self, "子分组", intern(子分组))
+        set_attr(self, "学年", intern(学年))
+        set_attr(self, "年制", intern(年制))
+        set_attr(self, "专业名", intern(专业名))
+        set_attr(self, "班级号", intern(班级号))
+        set_attr(self, "姓名", 姓名)
+        set_attr(self, "完整班级名", _full_class_name(学年, 年制, 专业名, 班级号))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"StudentRecord 不可修改: {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"StudentRecord 不可修改: {name}")
+
+    def __reduce__(self):
+        # 默认的 pickle 会逐个 setattr，不可变对象需要走构造函数（多进程批量生成时用到）
+        return self.__class__, self.fields()
+
+    def fields(self) -> tuple[str, str, str, str, str, str]:
+        """(子分组, 学年, 年制, 专业名, 班级号, 姓名)"""
+        return self.子分组, self.学年, self.年制, self.专业名, self.班级号, self.姓名
+
+    def __iter__(self) -> Iterator[str]:
+        """兼容旧的 (完整班级名, 姓名) 二元组解包"""
+        yield self.完整班级名
+        yield self.姓名
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StudentRecord):
+            return NotImplemented
+        return self.fields() == other.fields()
+
+    def __hash__(self) -> int:
+        return hash(self.fields())
+
+    def __repr__(self) -> str:
+        return f"StudentRecord{self.fields()!r}"
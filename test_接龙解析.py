@@ -0,0 +1,234 @@
+import io
+import os
+import random
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+
+import chinese_to_int
+import jielong_reader
+from benchmark import generate_接龙
+from input_handler import 会话输入器, 我的输入器
+from jielong_session import JielongSession
+from jielong_tokenizer import tokenize_line
+from major_resolver import MajorResolver
+from student_record import StudentRecord
+
+
+class TestJielongReader(unittest.TestCase):
+
+    def setUp(self):
+        """测试前置设置"""
+        self.parser = 我的输入器()
+        self.text = 我的输入器._get_接龙输入()
+
+    def _parse(self, source) -> list[StudentRecord]:
+        with redirect_stdout(io.StringIO()):
+            return list(self.parser._iter_stu_data_match_result_from_source(source))
+
+    def test_header_and_end_rules(self):
+        """测试跳过表头、遇到空行结束"""
+        lines = ["#接龙", "随便写点", "", "1. 视频组25数媒 张三", "2. 25软件 李四", "", "3. 25计应 王五"]
+        self.assertEqual(list(jielong_reader.iter_接龙_lines(lines)),
+                         ["1. 视频组25数媒 张三", "2. 25软件 李四"])
+
+    def test_no_first_line(self):
+        """测试没有 "1." 开头的行时什么都不产出"""
+        self.assertEqual(list(jielong_reader.iter_接龙_lines(["#接龙", "视频组", ""])), [])
+
+    def test_sources_are_equivalent(self):
+        """测试行序列、二进制流、文件路径三种来源的解析结果一致"""
+        expected = self._parse(self.text.splitlines())
+        self.assertEqual(len(expected), 16)
+
+        data = self.text.replace("\n", "\r\n").encode("utf-8-sig")
+        stream = io.BytesIO(data)
+        self.assertEqual(self._parse(stream), expected)
+        self.assertFalse(stream.closed)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "接龙.txt")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(self._parse(path), expected)
+
+    def test_match_results(self):
+        """测试匹配结果"""
+        results = self._parse(self.text.splitlines())
+        self.assertEqual(results[0].fields(), ("视频组", "24", "", "计应单二", "", "温正铁"))
+        self.assertEqual(results[1].fields(), ("视频组", "25", "", "计应单", "二", "杨智睿"))
+        self.assertEqual(results[9].fields(), ("", "25", "", "数媒", "", "奚玉镒"))
+        self.assertEqual(results[1].完整班级名, "25计应单二")
+
+    def test_major_normalized(self):
+        """测试专业名统一为简称，修饰部分保留"""
+        student = self.parser._to_student_record(("视频组", "25", "", "人工智能技术应用单", "二", "张三"))
+        self.assertEqual((student.完整班级名, student.姓名), ("25人工智能单二", "张三"))
+
+    def test_positional_numerals(self):
+        """测试学年、班级号写成 二十五、十二 也能解析，班级号同阿拉伯数字一样逐位写成中文"""
+        for line, expected in [("1. 视频组二十五数媒十二 张三", ("视频组", "25", "", "数媒", "一二", "张三")),
+                               ("1. 二十数媒十班 李四", ("", "20", "", "数媒", "一零", "李四")),
+                               ("1. 25计应二十一班 王五", ("", "25", "", "计应", "二一", "王五")),
+                               ("1. 25数媒12 赵六", ("", "25", "", "数媒", "一二", "赵六"))]:
+            with self.subTest(line=line):
+                self.assertEqual(我的输入器._match_line(line), expected)
+                self.assertEqual(tokenize_line(line), 我的输入器.compiled_pattern.match(line).groups(""))
+        student = self._parse(["1. 视频组二十五数媒十二 张三"])[0]
+        self.assertEqual(student.完整班级名, "25数媒一二")
+
+    def test_fuzzy_major(self):
+        """测试打错的专业名默认只提示；开启 auto_apply 后，候选唯一且改动不到一半的才改正，修饰保留"""
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(self.parser._to_student_record(("", "25", "", "计算机应永单", "二", "张三")).完整班级名,
+                             "25计算机应永单二")
+            self.assertIn("未识别的专业名: 计算机应永单（张三），是否是 计算机应用？", output.getvalue())
+
+            self.parser.config_reader.override({"fuzzy_major_settings": {"auto_apply": True}})
+            student = self.parser._to_student_record(("", "25", "", "计算机应永单", "二", "张三"))
+            self.assertEqual(student.完整班级名, "25计应单二")
+            self.assertIn("专业名 计算机应永单 按 计算机应用 处理", output.getvalue())
+            # 两个字的专业名改一个字就是另一个专业了，只提示
+            self.assertEqual(self.parser._to_student_record(("", "25", "", "数煤", "", "李四")).完整班级名, "25数煤")
+            self.assertEqual(self.parser._to_student_record(("", "25", "", "电商", "", "赵六")).完整班级名, "25电商")
+
+            resolver = MajorResolver({"软件技术": "软件", "硬件技术": "硬件"})
+            self.assertTrue(resolver.correct("欤件技术").is_ambiguous)
+            self.assertEqual(self.parser._correct_major("欤件技术", "王五", resolver), "欤件技术")
+            self.assertIsNone(resolver.correct("张三"))
+
+    def test_generated_corpus(self):
+        """测试基准测试合成的接龙：同一种子结果相同，学生行全部能解析"""
+        class_mappings = self.parser.config_reader.get("class_mappings", {})
+        text, student_count = generate_接龙(500, class_mappings, seed=1)
+        self.assertEqual(generate_接龙(500, class_mappings, seed=1), (text, student_count))
+        self.assertEqual(len(self._parse(text.splitlines())), student_count)
+
+    def test_tokenizer_matches_regex(self):
+        """对拍：分词器与正则在合成接龙及其随机变异、随机乱行上的结果完全相同"""
+        text, _ = generate_接龙(2000, self.parser.config_reader.get("class_mappings", {}), seed=2)
+        lines = text.splitlines()
+        alphabet = "0123456789二五〇两十拾组班级年制数媒软件张三 \t\u3000.,-;:，；_a٣０😀"
+        rng = random.Random(0)
+        corpus = lines + self.text.splitlines() + ["1. 视频组二十五数媒十二 张三", "二十数媒二十一班 李四"]
+        for _ in range(20000):
+            if rng.random() < 0.5:
+                corpus.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))))
+                continue
+            chars = list(rng.choice(lines))
+            for _ in range(rng.randint(1, 4)):
+                index = rng.randint(0, len(chars))
+                if rng.random() < 0.5 or not chars:
+                    chars.insert(index, rng.choice(alphabet))
+                else:
+                    chars[min(index, len(chars) - 1)] = rng.choice(alphabet)
+            corpus.append("".join(chars))
+
+        for line in corpus:
+            match_result = 我的输入器.compiled_pattern.match(line)
+            self.assertEqual(tokenize_line(line), match_result.groups("") if match_result else None, line)
+
+    def test_tokenizer_is_linear(self):
+        """测试让正则回溯几十秒的长乱行：输入长 8 倍，分词器的耗时也只多几倍（不比绝对时间，慢机器上也稳定）"""
+        self.assertEqual(tokenize_line("1. 视频组25数媒" + " " * 5000 + "张三"), ("视频组", "25", "", "数媒", "", "张三"))
+
+        def best_time(line: str) -> float:
+            timings = []
+            for _ in range(5):
+                start = time.perf_counter()
+                tokenize_line(line)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        for make_line in (lambda n: "25数媒" + " " * n + "x", lambda n: "组一一" * n):
+            with self.subTest(line=make_line(3)):
+                self.assertIsNone(tokenize_line(make_line(8000)))
+                # 线性约为 8 倍，回溯的正则是平方到立方级（64–512 倍）
+                self.assertLess(best_time(make_line(8000)) / best_time(make_line(1000)), 24)
+
+    def test_session_only_matches_changed_lines(self):
+        """测试会话只匹配新增和改动的行，并报告增删改"""
+        matched: list[str] = []
+
+        def match_line(line):
+            matched.append(line)
+            return 我的输入器._match_line(line)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "会话.json")
+            session = JielongSession(path)
+            changes = session.update(["1. 视频组25数媒 张三", "2. 25软件 李四", "3. 收到"], match_line)
+            self.assertEqual((len(changes.added), changes.unmatched), (3, ["3. 收到"]))
+            session.save()
+
+            matched.clear()
+            session = JielongSession(path)
+            changes = session.update(["1. 视频组25数媒 张三", "2. 25软件 李四四", "3. 收到", "4. 25计应 王五"],
+                                     match_line)
+            self.assertEqual(matched, ["2. 25软件 李四四", "4. 25计应 王五"])
+            self.assertEqual(changes.added, ["4. 25计应 王五"])
+            self.assertEqual(changes.edited, [("2. 25软件 李四", "2. 25软件 李四四")])
+            self.assertEqual((changes.unmatched, changes.still_unmatched), ([], 1))
+            self.assertEqual([match_result[5] for match_result in changes.match_results], ["张三", "李四四", "王五"])
+
+            changes = session.update(["1. 视频组25数媒 张三", "4. 25计应 王五"], match_line)
+            self.assertEqual(changes.removed, ["2. 25软件 李四四", "3. 收到"])
+            session.save()
+
+            # 解析规则或 class_mappings 变了（会话键不同），旧的匹配结果不再使用
+            self.assertEqual(len(JielongSession(path).lines), 2)
+            self.assertEqual(JielongSession(path, key="新规则").lines, {})
+
+    def test_session_handler(self):
+        """测试会话输入器产出合并后的完整名单"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            handler = 会话输入器()
+            handler.config_reader.override({"session_settings": {"path": os.path.join(tmp_dir, "会话.json")}})
+            with redirect_stdout(io.StringIO()):
+                first = list(handler._iter_stu_data_from_session(self.text.splitlines()))
+                second = list(handler._iter_stu_data_from_session(self.text.splitlines()))
+            self.assertEqual(first, self._parse(self.text.splitlines()))
+            self.assertEqual(second, first)
+
+            # 打错专业名的旧行不再重复提示，只提示新增的行
+            lines = ["1. 25计算机应永单二 张三", "2. 25软件 李四"]
+            with redirect_stdout(io.StringIO()) as output:
+                list(handler._iter_stu_data_from_session(lines))
+            self.assertEqual(output.getvalue().count("未识别的专业名"), 1)
+            with redirect_stdout(io.StringIO()) as output:
+                students = list(handler._iter_stu_data_from_session(lines + ["3. 25数煤 王五"]))
+            self.assertEqual(output.getvalue().count("未识别的专业名"), 1)
+            self.assertIn("数煤（王五）", output.getvalue())
+            self.assertEqual([student.完整班级名 for student in students], ["25计算机应永单二", "25软件", "25数煤"])
+
+
+class TestChineseNumerals(unittest.TestCase):
+
+    def test_digitwise_and_positional(self):
+        """测试逐位写法保持原样，并支持 十/百 位值写法"""
+        for text, value in [("二五", 25), ("２5", 25), ("壹贰", 12), ("", 0), ("十", 10), ("十二", 12),
+                            ("二十五", 25), ("一百零五", 105), ("一百五", 150), ("两百", 200)]:
+            with self.subTest(text=text):
+                self.assertEqual(chinese_to_int.chinese_to_int(text), value)
+        for text in ["二x", "二三十", "一百零", "零十"]:
+            with self.subTest(text=text):
+                self.assertIsNone(chinese_to_int.chinese_to_int_op(text))
+        self.assertEqual(chinese_to_int.int_to_chinese_op(25), "二五")
+        self.assertEqual(chinese_to_int.int_to_chinese_op(1024), "一零二四")
+        self.assertEqual(chinese_to_int.int_to_chinese_positional(110), "一百一十")
+        for value in range(chinese_to_int.LOOKUP_MAX + 1):
+            self.assertEqual(chinese_to_int.chinese_to_int(chinese_to_int.int_to_chinese_positional(value)), value)
+
+    def test_normalize_digits(self):
+        """测试批量规整全角数字后解析结果不变，全角序号的接龙也能识别"""
+        text = "１. 视频组２５数媒２班 张三\n２. ２５软件 李四壹"
+        self.assertEqual(chinese_to_int.normalize_digits(text), "1. 视频组25数媒2班 张三\n2. 25软件 李四壹")
+        for line in text.splitlines():
+            self.assertEqual(我的输入器._match_line(chinese_to_int.normalize_digits(line)), 我的输入器._match_line(line))
+        self.assertEqual(list(jielong_reader.iter_接龙_lines(text.splitlines())),
+                         ["1. 视频组25数媒2班 张三", "2. 25软件 李四壹"])
+
+
+if __name__ == '__main__':
+    unittest.main()
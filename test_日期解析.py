@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import unittest
 from datetime import datetime, date
 from input_handler import 我的输入器  # 替换为实际的模块和类名
@@ -205,6 +207,49 @@ class TestDateParser(unittest.TestCase):
                 with self.assertRaises(ValueError):
                     self.parser._get_ymd_time_by_str_save(invalid_input)
 
+    def test_date_lists_and_ranges(self):
+        """测试日期列表和范围"""
+        # 以2023-10-15（周日）为基准
+        base_date = datetime(2023, 10, 15)
+
+        test_cases = [
+            # (输入字符串, 期望日期列表)
+            ("td+1, td+3", [date(2023, 10, 16), date(2023, 10, 18)]),
+            ("2023-10-1，2023-10-3", [date(2023, 10, 1), date(2023, 10, 3)]),
+            ("td..td+2", [date(2023, 10, 15), date(2023, 10, 16), date(2023, 10, 17)]),
+            ("2023-10-30..2023-11-1", [date(2023, 10, 30), date(2023, 10, 31), date(2023, 11, 1)]),
+            ("2023.10.30..2023.10.31", [date(2023, 10, 30), date(2023, 10, 31)]),
+            ("week+1 1..3", [date(2023, 10, 16), date(2023, 10, 17), date(2023, 10, 18)]),
+            ("w 6..0", [date(2023, 10, 14), date(2023, 10, 15)]),
+            ("td, td..td+1, td+1", [date(2023, 10, 15), date(2023, 10, 16)]),  # 去重
+            ("td", [date(2023, 10, 15)]),
+            # 逗号作为单个日期里的分隔符（回归）
+            ("2020,7,1", [date(2020, 7, 1)]),
+            ("2020，7，1", [date(2020, 7, 1)]),
+            ("td, 2020,7,1", [date(2023, 10, 15), date(2020, 7, 1)]),
+            ("2020,7,1..2020,7,2", [date(2020, 7, 1), date(2020, 7, 2)]),
+            ("2020,12,1", [date(2020, 12, 1)]),
+            ("2020,11,5..2020,11,6", [date(2020, 11, 5), date(2020, 11, 6)]),
+            ("2020，10，1..2020，10，3, td", [date(2020, 10, 1), date(2020, 10, 2), date(2020, 10, 3),
+                                           date(2023, 10, 15)]),
+        ]
+
+        for input_str, expected_dates in test_cases:
+            with self.subTest(input=input_str):
+                result = self.parser._get_ymd_times_by_str_save(input_str, base_date)
+                self.assertEqual([date(*ymd) for ymd in result], expected_dates)
+
+        for invalid_input in ["td+1..td", "td..td+400", "2023-2-30..2023-3-1", "td..", ", ,"]:
+            with self.subTest(input=invalid_input):
+                with self.assertRaises(ValueError):
+                    self.parser._get_ymd_times_by_str_save(invalid_input, base_date)
+
+    def test_date_parsing_does_not_load_docx(self):
+        """测试只解析日期时不加载 python-docx"""
+        code = ("import sys, input_handler; input_handler.我的输入器()._get_ymd_times_by_str_save('td..td+1'); "
+                "sys.exit('docx' in sys.modules)")
+        self.assertEqual(subprocess.run([sys.executable, "-c", code]).returncode, 0)
+
     def test_empty_input(self):
         """测试空输入"""
         with self.assertRaises(ValueError):
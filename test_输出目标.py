@@ -0,0 +1,295 @@
+import io
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from docx import Document
+
+from batch_main import build_tasks
+from config_reader import ConfigReader
+from docx_generator import DocumentGenerator
+from input_handler import 分组多输出输入器
+from leave_form_daemon import LeaveFormDaemon, request_daemon
+from leave_history import HISTORY_FILE_NAME
+from output_sinks import BytesIOSink, FileSystemSink, NullSink, ZipSink
+import semester_report
+from semester_report import SemesterAggregate, iter_rows_from_files, iter_rows_from_history, write_csv, write_docx
+from student_record import StudentRecord
+from watch_inbox import InboxWatcher
+
+
+def _output_files(directory: str) -> list[str]:
+    """输出目录中除假单历史数据库以外的文件"""
+    return sorted(name for name in os.listdir(directory) if not name.startswith(HISTORY_FILE_NAME))
+
+
+class TestOutputSinks(unittest.TestCase):
+
+    def setUp(self):
+        """测试前置设置"""
+        self.generator = DocumentGenerator(ConfigReader("config.json"))
+        self.students = [StudentRecord("视频组", "25", "", "数媒", "二", "张三"),
+                         StudentRecord("视频组", "25", "", "软件", "", "李四")]
+
+    def _create(self, cause: str, sink):
+        return self.generator.create_leave_form(self.students, 2025, 4, 27, cause, sink=sink)
+
+    def _table_text(self, data: bytes) -> list[str]:
+        return [cell.text for cell in Document(io.BytesIO(data)).tables[0].rows[1].cells]
+
+    def test_bytes_sink(self):
+        """测试内存输出得到完整的 docx"""
+        data = self._create("DH部", BytesIOSink())
+        self.assertEqual(self._table_text(data)[:3], ["1", "25数媒二", "张三"])
+
+    def test_zip_sink(self):
+        """测试多份假单写进同一个 zip"""
+        with ZipSink() as sink:
+            self.assertEqual(self._create("DH部视频组", sink), "2025年4月27日_DH部视频组假单.docx")
+            self._create("DH部软件组", sink)
+        with zipfile.ZipFile(io.BytesIO(sink.getvalue())) as archive:
+            self.assertEqual(archive.namelist(), ["2025年4月27日_DH部视频组假单.docx",
+                                                  "2025年4月27日_DH部软件组假单.docx"])
+            self.assertEqual(self._table_text(archive.read(archive.namelist()[1]))[:3], ["1", "25数媒二", "张三"])
+
+    def test_create_leave_forms(self):
+        """测试多个日期共用一次构建，结果与逐个生成相同"""
+        dates = [(2025, 4, 27), (2025, 4, 28)]
+        results = self.generator.create_leave_forms(self.students, dates, "DH部", sink=BytesIOSink())
+        for (year, month, day), data in zip(dates, results):
+            expected = self.generator.create_leave_form(self.students, year, month, day, "DH部", sink=BytesIOSink())
+            with zipfile.ZipFile(io.BytesIO(data)) as actual_zip, zipfile.ZipFile(io.BytesIO(expected)) as expected_zip:
+                self.assertEqual(actual_zip.read("word/document.xml"), expected_zip.read("word/document.xml"))
+
+    def test_file_system_and_null_sink(self):
+        """测试写文件返回路径，空输出什么都不写"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = self._create("DH部", FileSystemSink(tmp_dir))
+            self.assertEqual(file_path, os.path.join(tmp_dir, "2025年4月27日_DH部假单.docx"))
+            self.assertTrue(os.path.isfile(file_path))
+            self._create("空", NullSink())
+            self.assertEqual(_output_files(tmp_dir), ["2025年4月27日_DH部假单.docx"])
+
+
+class TestOutputManifest(unittest.TestCase):
+
+    def setUp(self):
+        """测试前置设置"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.handler = 分组多输出输入器()
+        self.handler.config_reader.override({"output_settings": {"save_path": self.tmp_dir.name}})
+        self.grouped = {"视频组": [StudentRecord("视频组", "25", "", "数媒", "", "张三")],
+                        "软件组": [StudentRecord("软件组", "25", "", "软件", "", "李四")]}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _save(self, grouped) -> list[str]:
+        with redirect_stdout(io.StringIO()):
+            return self.handler._save_grouped_stu_data(grouped, [(2025, 4, 27)], cause="DH部")
+
+    def test_skip_unchanged_groups(self):
+        """测试只重新生成名单变化的子分组"""
+        self.assertEqual(self._save(self.grouped), [])
+        self.assertEqual(len(_output_files(self.tmp_dir.name)), 3)
+        self.assertEqual(self._save(self.grouped), ["视频组", "软件组"])
+
+        # 名单顺序不影响，新增一人只重新生成该组
+        self.grouped["软件组"] = [StudentRecord("软件组", "25", "", "软件", "", "王五")] + self.grouped["软件组"]
+        self.assertEqual(self._save(self.grouped), ["视频组"])
+        self.assertEqual(self._save(self.grouped), ["视频组", "软件组"])
+
+        # 输出文件被删掉时重新生成
+        os.remove(os.path.join(self.tmp_dir.name, "2025年4月27日_DH部视频组假单.docx"))
+        self.assertEqual(self._save(self.grouped), ["软件组"])
+
+    def test_combined_document(self):
+        """测试合并模式：所有子分组一个文件，每组一节，首页汇总"""
+        self.handler.config_reader.override({"output_settings": {"combine_groups": True}})
+        self.assertEqual(self._save(self.grouped), [])
+        self.assertEqual(_output_files(self.tmp_dir.name), [".假单清单.json", "2025年4月27日_DH部假单.docx"])
+        doc = Document(os.path.join(self.tmp_dir.name, "2025年4月27日_DH部假单.docx"))
+        self.assertEqual(len(doc.sections), 3)
+        self.assertEqual([[cell.text for cell in row.cells] for row in doc.tables[0].rows],
+                         [["子分组", "人数"], ["视频组", "1"], ["软件组", "1"], ["合计", "2"]])
+        self.assertEqual(self._save(self.grouped), ["合并文档"])
+
+        # 不传 cover_summary 时同样取配置（默认 True）
+        doc = self.handler.docx_generator.build_combined_leave_form(self.grouped, 2025, 4, 27, "DH部")
+        self.assertEqual(doc.tables[0].rows[0].cells[0].text, "子分组")
+
+
+class TestLeaveHistory(unittest.TestCase):
+
+    def test_record_and_query(self):
+        """测试落盘的假单写入输出目录里的历史，重新生成、合并生成都不重复计数，按学生、班级、月份汇总"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_reader = ConfigReader("config.json")
+            config_reader.override({"output_settings": {"save_path": tmp_dir}})
+            generator = DocumentGenerator(config_reader)
+            zhang = StudentRecord("视频组", "25", "", "数媒", "二", "张三")
+            li = StudentRecord("软件组", "25", "", "软件", "", "李四")
+            # 只在内存中生成的不记录
+            generator.create_leave_form([zhang], 2025, 3, 3, "DH部", sink=BytesIOSink())
+            generator.create_leave_form([zhang], 2025, 3, 3, "DH部", sink=NullSink())
+            self.assertIsNone(generator._history)
+
+            generator.create_leave_forms([zhang], [(2025, 3, 3), (2025, 3, 4)], "DH部视频组")
+            generator.create_leave_forms([li], [(2025, 3, 3), (2025, 3, 4)], "DH部软件组")
+            generator.create_combined_leave_form({"视频组": [zhang], "软件组": [li]}, 2025, 3, 4, "DH部")
+            generator.create_leave_form([zhang], 2025, 4, 1, "DH部")
+            generator.create_leave_form([zhang], 2025, 4, 1, "DH部")
+            generator.create_leave_form([zhang], 2025, 4, 1, "DH部", leave_type="morning")
+
+            store = generator._history
+            self.assertEqual(store.db_path, os.path.join(tmp_dir, HISTORY_FILE_NAME))
+            self.assertEqual(store.student_totals("张三"), [("25数媒二", "evening", 3, "2025-03-03", "2025-04-01"),
+                                                          ("25数媒二", "morning", 1, "2025-04-01", "2025-04-01")])
+            self.assertEqual(store.student_dates("张三", date_to="2025-03-31"),
+                             [("2025-03-03", "evening"), ("2025-03-04", "evening")])
+            self.assertEqual(store.class_totals(leave_type="evening"), [("25数媒二", 3, 1), ("25软件", 2, 1)])
+            # 3/4 的分组假单已被合并假单取代
+            self.assertEqual(store.month_totals(), [("2025-03", 3, 4, 2), ("2025-04", 2, 2, 1)])
+
+            aggregate = SemesterAggregate()
+            aggregate.add_all(iter_rows_from_history(store, None, "2025-03-31", None))
+            store.close()
+            self.assertEqual(aggregate.sections()[2], ("各周", "周（周一）", [("2025-03-03", 4)]))
+            csv_path = os.path.join(tmp_dir, "汇总.csv")
+            write_csv(aggregate, csv_path)
+            with open(csv_path, encoding="utf-8-sig") as f:
+                self.assertEqual(f.read().splitlines()[1:3], ["各班级,25数媒二,2", "各班级,25软件,2"])
+
+
+class TestBatchTasks(unittest.TestCase):
+
+    def test_same_group_in_same_named_files(self):
+        """测试多个同名文件里都有同一子分组时，输出的原因各不相同"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = []
+            for directory in ["a", "b", os.path.join("x", "b"), os.path.join("y", "b")]:
+                os.makedirs(os.path.join(tmp_dir, directory))
+                files.append(Path(tmp_dir, directory, "接龙.txt"))
+                files[-1].write_text("1. 视频组25数媒二 张三\n", encoding="utf-8")
+            with redirect_stdout(io.StringIO()):
+                tasks, _ = build_tasks(分组多输出输入器(), files, 2025, 4, 27, "DH部", "evening")
+            self.assertEqual([task["cause"] for task in tasks],
+                             ["DH部视频组", "DH部接龙视频组", "DH部b接龙视频组", "DH部b接龙视频组2"])
+
+
+class TestSemesterReport(unittest.TestCase):
+
+    def test_report_from_files(self):
+        """测试从接龙文件汇总：未匹配的行按文件计数，专业名纠错提示照常输出，.docx 用假单的样式和表格"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "2025-03-03 接龙.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("1. 视频组25数媒二 张三\n2. 收到\n3. 25计算机应永单 李四\n4. 不知道\n")
+            handler = 分组多输出输入器()
+            aggregate = SemesterAggregate()
+            with redirect_stdout(io.StringIO()) as output:
+                aggregate.add_all(iter_rows_from_files(handler, [Path(path)]))
+            self.assertEqual(aggregate.total, 2)
+            self.assertIn("中有 2 行未匹配，如: 2. 收到", output.getvalue())
+            self.assertNotIn("未匹配的学生数据", output.getvalue())
+            self.assertIn("未识别的专业名: 计算机应永单", output.getvalue())
+
+            docx_path = os.path.join(tmp_dir, "汇总.docx")
+            write_docx(aggregate, docx_path, "三月汇总", handler.config_reader)
+            doc = Document(docx_path)
+            self.assertEqual(doc.paragraphs[0].style.name, "假单标题")
+            self.assertEqual([len(table.rows) for table in doc.tables], [3, 3, 2])
+            self.assertEqual(doc.tables[0].rows[0].cells[0].paragraphs[0].style.name, "假单表头")
+
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(semester_report.main([path, "--history", "-o", docx_path]), 1)
+
+
+class TestLeaveFormDaemon(unittest.TestCase):
+
+    def test_round_trip(self):
+        """测试通过套接字发送接龙，取回文档内容"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            socket_path = os.path.join(tmp_dir, "daemon.sock")
+            daemon = LeaveFormDaemon()
+            thread = threading.Thread(target=daemon.serve, args=(socket_path,), daemon=True)
+            with redirect_stdout(io.StringIO()):
+                thread.start()
+                while not os.path.exists(socket_path):
+                    time.sleep(0.01)
+                # 连上后只发半个消息头的客户端不影响其他请求
+                stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                stalled.connect(socket_path)
+                stalled.sendall(b"\0\0")
+                response, payload = request_daemon({"date": "2025-4-27,2025-4-28", "text": "1. 视频组25数媒二 张三\n2. 乱写",
+                                                    "cause": "DH部", "return_bytes": True}, socket_path, timeout=5)
+                error_response = request_daemon({"date": "td", "text": "1. 乱写"}, socket_path)[0]
+                self.assertEqual(request_daemon({"date": "bad", "text": ""}, socket_path)[0]["ok"], False)
+                stalled.close()
+                request_daemon({"command": "stop"}, socket_path)
+                thread.join(5)
+
+        self.assertTrue(response["ok"])
+        self.assertIn("未匹配的学生数据: 2. 乱写", response["log"])
+        self.assertFalse(error_response["ok"])
+        self.assertIn("未匹配的学生数据: 1. 乱写", error_response["log"])
+        self.assertEqual([file_info["file_name"] for file_info in response["files"]],
+                         ["2025年4月27日_DH部视频组假单.docx", "2025年4月28日_DH部视频组假单.docx"])
+        self.assertEqual(self._first_row(payload[:response["files"][0]["size"]]), ["1", "25数媒二", "张三"])
+        self.assertFalse(thread.is_alive())
+
+    @staticmethod
+    def _first_row(data: bytes) -> list[str]:
+        return [cell.text for cell in Document(io.BytesIO(data)).tables[0].rows[1].cells][:3]
+
+
+class TestInboxWatcher(unittest.TestCase):
+
+    def test_generate_after_file_settles(self):
+        """测试启动前已有的文件也会处理；文件写完并稳定后只生成一次，临时文件忽略；同名子分组不互相覆盖"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            inbox = os.path.join(tmp_dir, "收件箱")
+            config_reader = ConfigReader("config.json")
+            config_reader.override({"cause": "DH部", "output_settings": {"save_path": tmp_dir},
+                                    "watch_settings": {"date": "2025-5-6", "debounce_seconds": 0.2,
+                                                       "poll_interval": 0.02}})
+            with redirect_stdout(io.StringIO()):
+                inbox_watcher = InboxWatcher(config_reader, inbox, force_polling=True)
+            with open(os.path.join(inbox, "早到.txt"), "w", encoding="utf-8") as f:
+                f.write("1. 视频组25软件 王五\n")
+            processed = []
+            process_file = inbox_watcher.process_file
+            inbox_watcher.process_file = lambda path: (processed.append(os.path.basename(path)), process_file(path))
+            thread = threading.Thread(target=inbox_watcher.run, daemon=True)
+            output = os.path.join(tmp_dir, "2025年5月6日_DH部接龙视频组假单.docx")
+            with redirect_stdout(io.StringIO()):
+                thread.start()
+                with open(os.path.join(inbox, "接龙.txt"), "w", encoding="utf-8") as f:
+                    f.write("1. 视频组25数媒二 张三\n")
+                    f.flush()
+                    time.sleep(0.1)
+                    f.write("2. 视频组25数媒二 李四\n")
+                with open(os.path.join(inbox, ".接龙.txt.swp"), "w", encoding="utf-8") as f:
+                    f.write("1. 视频组25数媒二 王五\n")
+                deadline = time.monotonic() + 5
+                while not os.path.exists(output) and time.monotonic() < deadline:
+                    time.sleep(0.02)
+                time.sleep(0.3)
+                inbox_watcher.stop()
+                thread.join(5)
+
+            self.assertEqual(processed, ["早到.txt", "接龙.txt"])
+            first = Document(os.path.join(tmp_dir, "2025年5月6日_DH部视频组假单.docx"))
+            self.assertEqual([cell.text for cell in first.tables[0].rows[1].cells][:3], ["1", "25软件", "王五"])
+            self.assertEqual([cell.text for cell in Document(output).tables[0].rows[1].cells][3:6],
+                             ["2", "25数媒二", "李四"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from config_reader import ConfigReader
+
+
+class TestConfigReader(unittest.TestCase):
+
+    def setUp(self):
+        """测试前置设置"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp_dir.name, "config.json")
+        self._write({"cause": "DH部", "font_settings": {"font_size": {"title": 16}}})
+        self.config_reader = ConfigReader(self.config_path, reload_interval=0)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, config: dict, mtime_ns: int = 1_000_000_000):
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump(config, f, ensure_ascii=False)
+        # 文件系统的时间精度可能很粗，直接指定修改时间
+        os.utime(self.config_path, ns=(mtime_ns, mtime_ns))
+
+    def test_dotted_lookup(self):
+        """测试点分路径查找，与默认配置合并"""
+        self.assertEqual(self.config_reader.get("cause"), "DH部")
+        self.assertEqual(self.config_reader.get("font_settings.font_size.title"), 16)
+        self.assertEqual(self.config_reader.get("font_settings.font_size.normal"), 11)
+        self.assertEqual(self.config_reader.get("font_settings.font_size.huge", 20), 20)
+        self.assertEqual(self.config_reader.get("cause.missing", "默认"), "默认")
+        self.assertEqual(self.config_reader.get("font_settings")["font_size"]["title"], 16)
+
+    def test_snapshot_is_read_only(self):
+        """测试快照不能原地修改，只能通过 override 覆盖"""
+        with self.assertRaises(TypeError):
+            self.config_reader.config["output_settings"]["save_path"] = "/tmp"
+        self.config_reader.override({"output_settings": {"save_path": "/tmp"}})
+        self.assertEqual(self.config_reader.get("output_settings.save_path"), "/tmp")
+        self.assertEqual(json.loads(json.dumps(self.config_reader.config))["cause"], "DH部")
+
+    def test_hot_reload(self):
+        """测试配置文件变化后换成新快照，override 保留，写坏的文件不生效"""
+        self.config_reader.override({"output_settings": {"save_path": "/tmp"}})
+        old_snapshot = self.config_reader.snapshot
+        self._write({"cause": "新部门"}, mtime_ns=2_000_000_000)
+        self.assertEqual(self.config_reader.get("cause"), "新部门")
+        self.assertEqual(self.config_reader.get("output_settings.save_path"), "/tmp")
+        self.assertEqual(old_snapshot.flat["cause"], "DH部")
+
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            f.write("{\"cause\": ")
+        os.utime(self.config_path, ns=(3_000_000_000, 3_000_000_000))
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(self.config_reader.get("cause"), "新部门")
+
+
+if __name__ == '__main__':
+    unittest.main()
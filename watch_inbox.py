@@ -0,0 +1,272 @@
+"""收件箱监视模式：接龙导出的 .txt 一落进收件箱目录就自动生成假单
+
+一个常驻进程持有加载好的配置、解析器和文档生成器；文件写完后一秒内出假单，不用每次启动程序、
+粘贴接龙、回答日期。Linux 上用 inotify（ctypes 调用 libc，不需要额外依赖）等待目录变化，
+其他系统或 inotify 不可用时退回定时扫描。复制、下载中的文件会连续触发多次修改，
+同一个文件在 debounce_seconds 内没有新变化、大小和修改时间也不再变才处理。
+启动时收件箱里已有的文件同样处理一遍（输入没变的假单按 skip_unchanged 跳过）。
+
+用法示例：
+    python watch_inbox.py                          # 收件箱取 watch_settings.inbox
+    python watch_inbox.py 接龙收件箱 --date td+1 --leave-type morning
+    python watch_inbox.py --poll                   # 强制使用定时扫描（网络盘上 inotify 收不到事件）
+"""
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from input_handler import print_red, print_warning
+
+# 只处理接龙导出文本；编辑器、下载工具的临时文件跳过
+INBOX_SUFFIXES = (".txt",)
+_ignored_prefixes = (".", "~$")
+
+FileSignature = tuple[int, int]  # (修改时间 ns, 大小)
+
+
+def _is_inbox_file(name: str) -> bool:
+    return name.lower().endswith(INBOX_SUFFIXES) and not name.startswith(_ignored_prefixes)
+
+
+def _signature(path: str) -> Optional[FileSignature]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class InotifyWatcher:
+    """用 inotify 等待目录中文件的创建、修改、写完关闭和移入"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    _event_header = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self, directory: str):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify 只在 Linux 上可用")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.directory = directory
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"无法监视目录: {directory}")
+
+    def wait(self, timeout: float) -> set[str]:
+        """最多等 timeout 秒，返回有变化的文件名；事件队列溢出时返回目录下全部文件"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names: set[str] = set()
+        offset = 0
+        while offset < len(data):
+            _, mask, _, name_length = self._event_header.unpack_from(data, offset)
+            offset += self._event_header.size
+            name = data[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+            if mask & self.IN_Q_OVERFLOW:
+                return set(os.listdir(self.directory))
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """定时扫描目录，比较各文件的修改时间和大小"""
+
+    def __init__(self, directory: str, interval: float = 1.0):
+        self.directory = directory
+        self.interval = interval
+        self._signatures = self._scan()
+
+    def _scan(self) -> dict[str, FileSignature]:
+        signatures: dict[str, FileSignature] = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+        return signatures
+
+    def wait(self, timeout: float) -> set[str]:
+        time.sleep(min(timeout, self.interval))
+        signatures = self._scan()
+        changed = {name for name, signature in signatures.items() if self._signatures.get(name) != signature}
+        self._signatures = signatures
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(directory: str, poll_interval: float = 1.0, force_polling: bool = False):
+    if not force_polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            # AttributeError：libc 里没有 inotify_* 函数
+            print_warning(f"无法使用 inotify（{e}），改为每 {poll_interval} 秒扫描一次")
+    return PollingWatcher(directory, poll_interval)
+
+
+class InboxWatcher:
+    """监视收件箱，文件稳定后跑一遍 分组多输出输入器 的解析、分组、生成"""
+
+    def __init__(self, config_reader, inbox: Optional[str] = None, force_polling: bool = False):
+        from input_handler import 分组多输出输入器
+
+        self.handler = 分组多输出输入器(config_reader=config_reader)
+        self.config_reader = config_reader
+        self.inbox = os.path.abspath(inbox or config_reader.get("watch_settings.inbox", "接龙收件箱"))
+        os.makedirs(self.inbox, exist_ok=True)
+        self.watcher = create_watcher(self.inbox, config_reader.get("watch_settings.poll_interval", 1.0),
+                                      force_polling)
+        self.stop_event = threading.Event()
+        self._pending: dict[str, tuple[float, Optional[FileSignature]]] = {}  # 文件名 -> (到期时间, 登记时的签名)
+        self._processed: dict[str, FileSignature] = {}
+        # (子分组, 日期) -> 最先生成这份假单的文件名；别的文件再出现时用文件名区分，同 batch_main
+        self._group_owners: dict[tuple[str, tuple[tuple[int, int, int], ...]], str] = {}
+
+    def warm_up(self) -> None:
+        """启动时就编译解析器、加载 python-docx，第一份文件不用等"""
+        self.handler.docx_generator.warm_up_in_background()
+        self.handler._match_groups("1. 视频组25数媒二 张三")
+
+    def _touch(self, name: str, now: float) -> None:
+        debounce = self.config_reader.get("watch_settings.debounce_seconds", 0.5)
+        self._pending[name] = (now + debounce, _signature(os.path.join(self.inbox, name)))
+
+    def _pop_ready(self, now: float) -> list[str]:
+        """到期且期间没有再变化的文件；期间又变了的重新计时"""
+        ready = []
+        for name, (due, signature) in list(self._pending.items()):
+            if due > now:
+                continue
+            current = _signature(os.path.join(self.inbox, name))
+            if current is None:
+                del self._pending[name]  # 已被删除或改名
+            elif current != signature:
+                self._touch(name, now)
+            else:
+                del self._pending[name]
+                if self._processed.get(name) != current:
+                    self._processed[name] = current
+                    ready.append(name)
+        return ready
+
+    def _disambiguate(self, grouped: dict[str, list], name: str,
+                      dates: list[tuple[int, int, int]]) -> dict[str, list]:
+        """不同文件里出现同名子分组、同一日期时，后来的子分组名前加上文件名，避免输出文件互相覆盖"""
+        stem = os.path.splitext(name)[0]
+        result = {}
+        for 子分组, stu_data in grouped.items():
+            owner = self._group_owners.setdefault((子分组, tuple(dates)), name)
+            result[子分组 if owner == name else f"{stem}{子分组}"] = stu_data
+        return result
+
+    def process_file(self, path: str) -> None:
+        """解析一个接龙文件并生成假单；日期表达式每次处理时重新计算，"td" 始终指当天"""
+        handler = self.handler
+        started = time.perf_counter()
+        print(f"[{datetime.now():%H:%M:%S}] 处理 {os.path.basename(path)}")
+        try:
+            dates = handler._get_ymd_times_by_str_save(self.config_reader.get("watch_settings.date", "td"))
+            grouped = handler._group_stu_data_by_子分组(handler._iter_stu_data_match_result_from_source(path))
+            if not grouped:
+                print_warning(f"{os.path.basename(path)} 中没有解析到学生数据（接龙需要从 \"1.\" 开头的行开始）")
+                return
+            grouped = self._disambiguate(grouped, os.path.basename(path), dates)
+            handler._save_grouped_stu_data(grouped, dates, cause=self.config_reader.get("cause", "？？部"),
+                                           leave_type=self.config_reader.get("watch_settings.leave_type", "evening"))
+        except ValueError as e:
+            print_red(f"{os.path.basename(path)} 处理失败: {e}")
+        except Exception as e:
+            print_red(f"{os.path.basename(path)} 生成请假单时发生错误: {e}")
+        else:
+            print(f"完成 {os.path.basename(path)}：{len(grouped)} 个分组，用时 {time.perf_counter() - started:.2f}s")
+
+    def run(self) -> None:
+        print(f"正在监视 {self.inbox}（{type(self.watcher).__name__}），按 Ctrl+C 退出")
+        # 启动前就放进收件箱的文件不会再触发事件，先登记一遍
+        now = time.monotonic()
+        for name in sorted(os.listdir(self.inbox)):
+            if _is_inbox_file(name):
+                self._touch(name, now)
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                timeout = 0.5
+                if self._pending:
+                    timeout = max(0.0, min(min(due for due, _ in self._pending.values()) - now, timeout))
+                for name in self.watcher.wait(timeout):
+                    if _is_inbox_file(name):
+                        self._touch(name, time.monotonic())
+                for name in self._pop_ready(time.monotonic()):
+                    self.process_file(os.path.join(self.inbox, name))
+        finally:
+            self.watcher.close()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from config_reader import ConfigReader
+
+    parser = argparse.ArgumentParser(description="监视收件箱目录，新的接龙文本自动生成假单")
+    parser.add_argument("inbox", nargs="?", default=None, help="收件箱目录，默认取 watch_settings.inbox")
+    parser.add_argument("-c", "--config", default="config.json", help="配置文件路径")
+    parser.add_argument("-d", "--date", default=None, help='日期表达式，默认取 watch_settings.date，如 "td+1"')
+    parser.add_argument("--cause", default=None, help="请假原因前缀，默认取配置里的 cause")
+    parser.add_argument("--leave-type", default=None, choices=["morning", "evening"])
+    parser.add_argument("--poll", action="store_true", help="不用 inotify，定时扫描")
+    args = parser.parse_args(argv)
+
+    config_reader = ConfigReader(args.config)
+    if args.cause is not None:
+        config_reader.override({"cause": args.cause})
+    watch_overrides = {"date": args.date, "leave_type": args.leave_type}
+    config_reader.override({"watch_settings": {key: value for key, value in watch_overrides.items() if value}})
+    try:
+        inbox_watcher = InboxWatcher(config_reader, args.inbox, force_polling=args.poll)
+    except OSError as e:
+        print_red(f"无法监视收件箱: {e}")
+        return 1
+    inbox_watcher.warm_up()
+    try:
+        inbox_watcher.run()
+    except KeyboardInterrupt:
+        print("已停止监视")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())